@@ -4,13 +4,36 @@ import json
 import singer
 from singer import utils, metadata, Catalog
 
+from tap_bigcommerce.batch import batch_writer_from_config
+from tap_bigcommerce.budget import shared_budget_from_config
+from tap_bigcommerce.cassette import cassette_from_config
 from tap_bigcommerce.client import BigCommerce
+from tap_bigcommerce.daemon import daemon_from_config
+from tap_bigcommerce.deadline import deadline_from_config
 from tap_bigcommerce.discover import discover_streams
+from tap_bigcommerce.fingerprints import fingerprint_store_from_config
+from tap_bigcommerce.hedging import hedger_from_config
+from tap_bigcommerce.http_cache import http_cache_from_config
+from tap_bigcommerce.memory import memory_guard_from_config
+from tap_bigcommerce.nested_cache import nested_cache_from_config
+from tap_bigcommerce.output import Output
+from tap_bigcommerce.parallel import transform_pool_from_config
+from tap_bigcommerce.passthrough import passthrough_from_config
+from tap_bigcommerce.planner import plan_sync, Progress
+from tap_bigcommerce.scheduler import scheduler_from_config
 from tap_bigcommerce.streams import STREAMS
+from tap_bigcommerce.stores import sync_stores, store_config
 from tap_bigcommerce.sync import sync_stream
+from tap_bigcommerce.targeted import read_targets, sync_targets, mark_done
+from tap_bigcommerce.trace import tracer_from_config
 
 REQUIRED_CONFIG_KEYS = [
-    "start_date", "client_id", "access_token", "store_hash"
+    "start_date"
+]
+
+# required in the config, or in every entry of `stores`
+STORE_CONFIG_KEYS = [
+    "client_id", "access_token", "store_hash"
 ]
 
 logger = singer.get_logger().getChild('tap-bigcommerce')
@@ -47,14 +70,119 @@ def ensure_credentials_are_authorized(client):
         raise Exception("BigCommerce Client not authorized.")
 
 
-def do_sync(client, catalog, state, start_date):
+def do_plan(client, catalog, state, start_date):
+    """
+    Estimate the requests and time needed to sync the selected streams
+    from their current bookmarks.
+    """
+    stream_bookmarks = []
+    for stream_name in get_selected_streams(catalog):
+        instance = STREAMS[stream_name](client)
+        bookmark = None
+        if instance.replication_method == "INCREMENTAL":
+            bookmark = instance.get_bookmark(state) or start_date
+        stream_bookmarks.append((stream_name, bookmark))
+
+    return plan_sync(client, stream_bookmarks)
+
+
+def open_resources(client, config):
+    """
+    Set the optional resources configured in `config` on the client,
+    unless the caller has already set them: multi-store mode shares one
+    scheduler between stores, daemon mode keeps every resource between
+    polls. Returns the names of the resources set here, to be released
+    with `close_resources`.
+    """
+    factories = [
+        ('budget',
+         lambda: shared_budget_from_config(config, client.store_hash)),
+        ('hedger', lambda: hedger_from_config(config)),
+        ('scheduler', lambda: scheduler_from_config(config)),
+        ('memory_guard', lambda: memory_guard_from_config(config)),
+        ('transform_pool', lambda: transform_pool_from_config(config)),
+        ('nested_cache', lambda: nested_cache_from_config(config)),
+        ('http_cache', lambda: http_cache_from_config(config)),
+        ('tracer', lambda: tracer_from_config(config))
+    ]
+
+    opened = []
+    for name, factory in factories:
+        if getattr(client.api, name) is not None:
+            continue
+        resource = factory()
+        if resource is not None:
+            setattr(client.api, name, resource)
+            opened.append(name)
+    return opened
+
+
+def close_resources(client, names):
+    """
+    Unset and release the resources set by `open_resources`, in reverse
+    order.
+    """
+    for name in reversed(names):
+        resource = getattr(client.api, name)
+        setattr(client.api, name, None)
+        if hasattr(resource, 'shutdown'):
+            resource.shutdown()
+        elif hasattr(resource, 'close'):
+            resource.close()
+
+
+def do_sync(client, catalog, state, start_date, config=None, output=None,
+            incremental_only=False, fingerprints=None):
+    """
+    Sync the selected streams and return the number of rows synced. With
+    `incremental_only`, full table streams are skipped (daemon mode).
+
+    Resources already set on the client and a given `fingerprints` store
+    are used as they are and left open, so the daemon can keep them
+    between polls.
+    """
+    config = config or {}
+    output = output or Output()
     ensure_credentials_are_authorized(client)
+    # customers day windows end at the start of this sync; in daemon
+    # mode the client is reused for every poll
+    client.utcnow = utils.now()
+    batch_writer = batch_writer_from_config(config, output)
+    if fingerprints is None:
+        fingerprints = fingerprint_store_from_config(config)
+
     selected_stream_names = get_selected_streams(catalog)
     populate_class_schemas(catalog, selected_stream_names)
 
     if state.get('bookmarks') is None:
         state = {'bookmarks': {}}
 
+    if config.get('request_timeout'):
+        client.api.timeout = config['request_timeout']
+
+    opened = open_resources(client, config)
+    memory_guard = client.api.memory_guard
+    transform_pool = client.api.transform_pool
+
+    # the deadline is shared across stores and polls when set by the
+    # caller, otherwise the run's time starts now
+    deadline = client.api.deadline
+    own_deadline = deadline is None
+    if own_deadline:
+        deadline = deadline_from_config(config)
+        client.api.deadline = deadline
+
+    plan = None
+    if config.get('plan') or config.get('plan_only'):
+        plan = do_plan(client, catalog, state, start_date)
+        if config.get('plan_only'):
+            json.dump(plan, sys.stdout, indent=2)
+            close_resources(client, opened)
+            if own_deadline:
+                client.api.deadline = None
+            return
+
+    rows = 0
     for stream in catalog.streams:
         stream_name = stream.tap_stream_id
 
@@ -64,7 +192,15 @@ def do_sync(client, catalog, state, start_date):
             logger.info("%s: Skipping - not selected", stream_name)
             continue
 
-        singer.write_schema(
+        if incremental_only and \
+                STREAMS[stream_name].replication_method != "INCREMENTAL":
+            continue
+
+        if deadline is not None and deadline.reached():
+            logger.info("%s: Skipping - max_runtime reached", stream_name)
+            continue
+
+        output.write_schema(
             stream_name,
             stream.schema.to_dict(),
             metadata.get(mdata, (), 'table-key-properties')
@@ -74,6 +210,7 @@ def do_sync(client, catalog, state, start_date):
 
         instance = STREAMS[stream_name](client)
         instance.stream = stream
+        instance.fingerprints = fingerprints
         if instance.replication_method == "INCREMENTAL":
             if state['bookmarks'].get(
                 stream.tap_stream_id, {}
@@ -82,13 +219,64 @@ def do_sync(client, catalog, state, start_date):
                     instance.replication_key: start_date
                 }
 
-        counter_value = sync_stream(state, instance)
+        progress = None
+        # child streams are planned by their parent's rows
+        if plan is not None and instance.plan_counts_rows:
+            progress = Progress(stream_name, plan['streams'][stream_name])
+
+        if memory_guard is not None:
+            memory_guard.start(stream_name)
+
+        passthrough = passthrough_from_config(
+            config, stream.schema.to_dict(), instance.selected_fields())
+
+        row_transform = None
+        if transform_pool is not None:
+            row_transform = client.api.row_transform(
+                client.resource_name(stream_name))
+
+        counter_value = sync_stream(
+            state, instance, batch_writer, transform_pool, progress, output,
+            passthrough, row_transform)
 
-        singer.write_state(state)
+        if memory_guard is not None:
+            memory_guard.finish()
+
+        output.write_state(state)
+
+        if fingerprints is not None:
+            fingerprints.save()
 
         logger.info("%s: Completed sync (%s rows)", stream_name, counter_value)
+        rows += counter_value
+
+    close_resources(client, opened)
+
+    if own_deadline:
+        client.api.deadline = None
 
     logger.info("Finished sync")
+    return rows
+
+
+def do_targeted_sync(client, catalog, config, output=None):
+    """
+    Sync only the rows listed in `target_ids_path`. Bookmarks are
+    neither read nor written.
+    """
+    ensure_credentials_are_authorized(client)
+    path = config['target_ids_path']
+
+    budget = shared_budget_from_config(config, client.store_hash)
+    if budget is not None:
+        client.api.budget = budget
+
+    selected_stream_names = get_selected_streams(catalog)
+    targets, files = read_targets(path)
+    sync_targets(client, catalog, targets, selected_stream_names, output)
+    mark_done(path, files)
+
+    logger.info("Finished targeted sync")
 
 
 @utils.handle_top_exception(logger)
@@ -101,11 +289,23 @@ def main():
     args = utils.parse_args(REQUIRED_CONFIG_KEYS)
     config = args.config
 
+    stores = config.get('stores')
+    if stores:
+        for store in stores:
+            utils.check_config(store_config(config, store), STORE_CONFIG_KEYS)
+        client_config = store_config(config, stores[0])
+    else:
+        utils.check_config(config, STORE_CONFIG_KEYS)
+        client_config = config
+
     # create instance of BigCommerce client
     bigcommerce = BigCommerce(
-        client_id=config['client_id'],
-        access_token=config['access_token'],
-        store_hash=config['store_hash']
+        client_id=client_config['client_id'],
+        access_token=client_config['access_token'],
+        store_hash=client_config['store_hash'],
+        adapter=cassette_from_config(config),
+        customers_version=client_config.get('customers_api_version', 2),
+        orders_expansion=client_config.get('orders_expansion')
     )
 
     # If discover flag was passed, run discovery mode and dump output to stdout
@@ -118,11 +318,54 @@ def main():
         else:
             catalog = Catalog.from_dict(discover_streams(bigcommerce))
 
+        if stores:
+            sync_stores(config, catalog, args.state, do_sync)
+            return
+
+        if config.get('target_ids_path'):
+            do_targeted_sync(bigcommerce, catalog, config)
+            return
+
+        daemon = daemon_from_config(config)
+        if daemon is not None:
+            # bookmarks are updated in place between polls
+            state = args.state or {}
+            state.setdefault('bookmarks', {})
+            # max_runtime bounds the whole daemon run, not each poll
+            deadline = deadline_from_config(config)
+            bigcommerce.api.deadline = deadline
+            # pools, caches, the hedger's latency samples and the
+            # fingerprints are kept warm between polls
+            resources = open_resources(bigcommerce, config)
+            fingerprints = fingerprint_store_from_config(config)
+
+            def poll(first):
+                rows = do_sync(
+                    client=bigcommerce,
+                    catalog=catalog,
+                    state=state,
+                    start_date=config['start_date'],
+                    config=config,
+                    incremental_only=not first,
+                    fingerprints=fingerprints
+                )
+                if deadline is not None and deadline.reached():
+                    daemon.stop.set()
+                return rows
+
+            daemon.install_signal_handlers()
+            try:
+                daemon.run(poll)
+            finally:
+                close_resources(bigcommerce, resources)
+            return
+
         do_sync(
             client=bigcommerce,
             catalog=catalog,
             state=args.state,
-            start_date=config['start_date']
+            start_date=config['start_date'],
+            config=config
         )
 
 
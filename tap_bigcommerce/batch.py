@@ -0,0 +1,187 @@
+#!/usr/bin/env python
+"""
+Batch file output for Singer BATCH messages.
+
+Instead of writing every record to stdout as a RECORD message, records
+are appended to gzip compressed JSONL files in a local directory. A file
+is rotated once it reaches `max_records` records or `max_bytes`
+(uncompressed) bytes. On rotation the file is flushed, fsync'd and
+atomically renamed into place, and only then is a BATCH message
+referencing it written to stdout. Callers should only emit STATE after
+`write` reports a rotation (or after `flush`), so that bookmarks never
+get ahead of the records that are durable on disk.
+"""
+import os
+import gzip
+import time
+
+import simplejson as json
+import singer
+from singer.messages import Message
+
+
+logger = singer.get_logger().getChild('tap-bigcommerce')
+
+DEFAULT_MAX_RECORDS = 100000
+
+DEFAULT_MAX_BYTES = 100 * 1024 * 1024
+
+
+class BatchMessage(Message):
+    """
+    BATCH message.
+
+    Points a target at one or more local files containing records for
+    the stream, encoded as gzip compressed JSONL.
+    """
+
+    def __init__(self, stream, manifest, encoding=None):
+        self.stream = stream
+        self.manifest = manifest
+        self.encoding = encoding or {
+            'format': 'jsonl',
+            'compression': 'gzip'
+        }
+
+    def asdict(self):
+        return {
+            'type': 'BATCH',
+            'stream': self.stream,
+            'encoding': self.encoding,
+            'manifest': self.manifest
+        }
+
+
+def write_batch(stream_name, manifest):
+    singer.write_message(BatchMessage(stream_name, manifest))
+
+
+class BatchFile():
+
+    def __init__(self, path):
+        self.path = path
+        self.tmp_path = path + '.part'
+        self.records = 0
+        self.bytes = 0
+        self._raw = open(self.tmp_path, 'wb')
+        self._file = gzip.GzipFile(fileobj=self._raw, mode='wb')
+
+    def write(self, record_json):
+        line = (record_json + '\n').encode('utf-8')
+        self._file.write(line)
+        self.records += 1
+        self.bytes += len(line)
+
+    def close(self):
+        """
+        Close the file and make it durable: flush the gzip trailer,
+        fsync the data, rename into place and fsync the directory
+        so the rename itself survives a crash.
+        """
+        self._file.close()
+        self._raw.flush()
+        os.fsync(self._raw.fileno())
+        self._raw.close()
+        os.rename(self.tmp_path, self.path)
+
+        dir_fd = os.open(os.path.dirname(self.path), os.O_RDONLY)
+        try:
+            os.fsync(dir_fd)
+        finally:
+            os.close(dir_fd)
+
+    def discard(self):
+        self._file.close()
+        self._raw.close()
+        os.remove(self.tmp_path)
+
+
+class BatchWriter():
+
+    def __init__(self, directory, max_records=DEFAULT_MAX_RECORDS,
+                 max_bytes=DEFAULT_MAX_BYTES, output=None):
+        self.directory = os.path.abspath(directory)
+        self.output = output
+        self.max_records = int(max_records)
+        self.max_bytes = int(max_bytes)
+        self.files = {}
+        self.sequence = 0
+
+        os.makedirs(self.directory, exist_ok=True)
+
+    def _open(self, stream_name):
+        self.sequence += 1
+        if self.output is not None:
+            stream_name = self.output.stream_name(stream_name)
+        filename = '{stream}-{ts}-{seq:05d}.jsonl.gz'.format(
+            stream=stream_name,
+            ts=int(time.time() * 1000),
+            seq=self.sequence
+        )
+        return BatchFile(os.path.join(self.directory, filename))
+
+    def write(self, stream_name, record):
+        """
+        Append a record to the stream's current batch file.
+
+        Returns True if the file was rotated (made durable and a BATCH
+        message emitted), signalling that it is safe to write STATE.
+        """
+        return self.write_serialized(
+            stream_name, json.dumps(record, use_decimal=True)
+        )
+
+    def write_serialized(self, stream_name, record_json):
+        batch_file = self.files.get(stream_name)
+        if batch_file is None:
+            batch_file = self.files[stream_name] = self._open(stream_name)
+
+        batch_file.write(record_json)
+
+        if batch_file.records >= self.max_records or \
+                batch_file.bytes >= self.max_bytes:
+            self._finish(stream_name)
+            return True
+
+        return False
+
+    def _finish(self, stream_name):
+        batch_file = self.files.pop(stream_name, None)
+        if batch_file is None:
+            return
+
+        if batch_file.records == 0:
+            batch_file.discard()
+            return
+
+        batch_file.close()
+        logger.info(
+            "%s: Wrote batch file %s (%s rows)",
+            stream_name, batch_file.path, batch_file.records
+        )
+        manifest = ['file://' + batch_file.path]
+        if self.output is not None:
+            self.output.write_batch(stream_name, manifest)
+        else:
+            write_batch(stream_name, manifest)
+
+    def flush(self, stream_name=None):
+        """
+        Finish the open batch file for `stream_name`, or for every
+        stream if no name is given.
+        """
+        names = [stream_name] if stream_name else list(self.files)
+        for name in names:
+            self._finish(name)
+
+
+def batch_writer_from_config(config, output=None):
+    if not config.get('batch_dir'):
+        return None
+
+    return BatchWriter(
+        config['batch_dir'],
+        max_records=config.get('batch_max_records', DEFAULT_MAX_RECORDS),
+        max_bytes=config.get('batch_max_bytes', DEFAULT_MAX_BYTES),
+        output=output
+    )
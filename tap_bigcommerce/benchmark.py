@@ -0,0 +1,291 @@
+#!/usr/bin/env python
+"""
+Microbenchmarks for the record processing path.
+
+Records are generated from the stream schemas, shaped like the API's
+responses, at several sizes: the number of items in each nested
+collection (order products, product variants and so on) and the depth of
+nesting that is filled in. Each helper on the per-record path is timed
+on its own, followed by `Stream.sync` and `sync_stream` over a mock
+client, and the results are reported in microseconds per record.
+
+    $ python -m tap_bigcommerce.benchmark --save benchmarks/baseline.json
+    $ python -m tap_bigcommerce.benchmark --compare benchmarks/baseline.json
+
+`--compare` exits with status 1 if any benchmark is slower than the
+baseline by more than `--tolerance`.
+"""
+import sys
+import json
+import timeit
+import argparse
+import contextlib
+from datetime import datetime, timedelta
+from concurrent.futures import Future
+
+from singer import Schema
+from singer.catalog import CatalogEntry
+
+from tap_bigcommerce.bigcommerce import Bigcommerce, filter_excluded_paths
+from tap_bigcommerce.bigcommerce import transform_dates, resolve_resources
+from tap_bigcommerce.bigcommerce import unpack_nested_resources
+from tap_bigcommerce.streams import STREAMS
+from tap_bigcommerce.sync import sync_stream
+
+
+# (items in each of a row's collections, depth of nesting filled in);
+# collections below the first level hold at most 2 items
+SIZES = {
+    'small': (1, 1),
+    'medium': (10, 2),
+    'large': (100, 3)
+}
+
+RESOURCES = ['orders', 'products']
+
+# fields the v2 API returns as nested resource stubs
+NESTED_RESOURCES = {
+    'orders': ['products', 'shipping_addresses', 'coupons']
+}
+
+DEFAULT_RECORDS = 50
+
+DEFAULT_TOLERANCE = 0.2
+
+START = datetime(2019, 1, 1)
+
+
+def sample_value(schema, key, i, items, depth):
+    types = schema.get('type', [])
+    types = [types] if isinstance(types, str) else types
+
+    if 'object' in types:
+        if depth <= 0:
+            return None
+        return {
+            k: sample_value(v, k, i, items, depth - 1)
+            for k, v in schema.get('properties', {}).items()
+        }
+    if 'array' in types:
+        if depth <= 0:
+            return []
+        return [
+            sample_value(
+                schema.get('items', {}), key, i + n, min(items, 2), depth)
+            for n in range(items)
+        ]
+    if schema.get('format') == 'date-time':
+        # v2 responses use RFC 2822 dates
+        date = START + timedelta(seconds=i)
+        return date.strftime('%a, %d %b %Y %H:%M:%S +0000')
+    if 'integer' in types:
+        return i
+    if 'number' in types:
+        return i * 1.25
+    if 'boolean' in types:
+        return i % 2 == 0
+    if 'string' in types:
+        return '{}-{}'.format(key, i)
+    return None
+
+
+def make_rows(resource, count, items, depth):
+    """
+    Generate `count` API rows for `resource`, with nested resources
+    resolved, and with dates in ascending order.
+    """
+    schema = STREAMS[resource](None).load_schema()
+    # the row itself is one level of nesting
+    return [
+        sample_value(schema, resource, i, items, depth + 1)
+        for i in range(count)
+    ]
+
+
+def stub_nested(resource, rows):
+    """
+    Replace nested resources with the stubs the API returns, and return
+    a getter serving the nested data from memory.
+    """
+    nested = {}
+    stubbed = []
+    for row in rows:
+        row = dict(row)
+        for key in NESTED_RESOURCES.get(resource, []):
+            url = '/{}/{}/{}'.format(resource, row['id'], key)
+            nested[url] = row[key]
+            row[key] = {'url': url, 'resource': '/' + key}
+        stubbed.append(row)
+
+    class Response():
+        def __init__(self, data):
+            self.data = data
+
+    def get(url, params={}):
+        future = Future()
+        future.set_result(Response(nested[url]))
+        return future
+
+    return stubbed, get
+
+
+class MockClient():
+
+    def __init__(self, records):
+        self.records = records
+
+    def __getattr__(self, name):
+        def get_data(replication_key=None, bookmark=None, cursor=None,
+                     fields=None):
+            return iter(self.records)
+        return get_data
+
+
+class Sink():
+
+    def write(self, data):
+        pass
+
+    def flush(self):
+        pass
+
+
+def make_catalog_entry(resource):
+    instance = STREAMS[resource](None)
+    return CatalogEntry(
+        tap_stream_id=resource,
+        stream=resource,
+        schema=Schema.from_dict(instance.load_schema()),
+        metadata=instance.load_metadata()
+    )
+
+
+def make_instance(resource, records, catalog_entry):
+    instance = STREAMS[resource](MockClient(records))
+    instance.stream = catalog_entry
+    return instance
+
+
+def time_per_record(fn, records, repeat=3):
+    """
+    Best of `repeat` runs of `fn`, in microseconds per record.
+    """
+    best = min(timeit.repeat(fn, number=1, repeat=repeat))
+    return round(best / max(records, 1) * 1e6, 2)
+
+
+def run_case(resource, records, items, depth):
+    endpoint = Bigcommerce.endpoints[resource]
+    exclude_paths = endpoint.get('exclude_paths', [])
+    date_fields = endpoint.get('transform_date_fields', [])
+
+    rows = make_rows(resource, records, items, depth)
+    stubbed, get = stub_nested(resource, rows)
+    unpack = unpack_nested_resources(get, exclude_paths)
+    unpacked = [unpack(row) for row in stubbed]
+    filtered = [filter_excluded_paths(row, exclude_paths) for row in rows]
+    transformed = [transform_dates(row, date_fields) for row in filtered]
+    catalog_entry = make_catalog_entry(resource)
+
+    def per_record():
+        for row in stubbed:
+            transform_dates(
+                filter_excluded_paths(
+                    resolve_resources(unpack(row)), exclude_paths),
+                date_fields)
+
+    def stream_sync():
+        state = {'bookmarks': {}}
+        instance = make_instance(resource, transformed, catalog_entry)
+        for _ in instance.sync(state):
+            pass
+
+    def full_sync():
+        state = {'bookmarks': {}}
+        instance = make_instance(resource, transformed, catalog_entry)
+        with contextlib.redirect_stdout(Sink()):
+            sync_stream(state, instance)
+
+    benchmarks = {
+        'filter_excluded_paths': lambda: [
+            filter_excluded_paths(row, exclude_paths) for row in rows],
+        'transform_dates': lambda: [
+            transform_dates(row, date_fields) for row in filtered],
+        'unpack_nested_resources': lambda: [
+            unpack(row) for row in stubbed],
+        'resolve_resources': lambda: [
+            resolve_resources(row) for row in unpacked],
+        'per_record': per_record,
+        'stream_sync': stream_sync,
+        'sync_stream': full_sync
+    }
+
+    return {
+        name: time_per_record(fn, records)
+        for name, fn in benchmarks.items()
+    }
+
+
+def run(records=DEFAULT_RECORDS, resources=RESOURCES, sizes=SIZES):
+    results = {}
+    for resource in resources:
+        for size, (items, depth) in sizes.items():
+            results['{}/{}'.format(resource, size)] = run_case(
+                resource, records, items, depth)
+    return results
+
+
+def compare(results, baseline, tolerance=DEFAULT_TOLERANCE):
+    """
+    Returns (case, benchmark, baseline, result, change) for every
+    benchmark present in both, and whether any regressed beyond
+    `tolerance`.
+    """
+    rows = []
+    regressed = False
+    for case, benchmarks in results.items():
+        for name, value in benchmarks.items():
+            before = baseline.get(case, {}).get(name)
+            if not before:
+                continue
+            change = (value - before) / before
+            regressed = regressed or change > tolerance
+            rows.append((case, name, before, value, change))
+    return rows, regressed
+
+
+def main():
+    parser = argparse.ArgumentParser(
+        description='Benchmark the record processing path'
+    )
+    parser.add_argument('--records', type=int, default=DEFAULT_RECORDS)
+    parser.add_argument('--save', help='write results to this JSON file')
+    parser.add_argument('--compare', help='compare with this baseline')
+    parser.add_argument('--tolerance', type=float,
+                        default=DEFAULT_TOLERANCE)
+    args = parser.parse_args()
+
+    results = run(records=args.records)
+
+    if args.compare:
+        with open(args.compare) as f:
+            baseline = json.load(f)
+        rows, regressed = compare(results, baseline, args.tolerance)
+        print('{:<16}{:<26}{:>12}{:>12}{:>9}'.format(
+            'case', 'benchmark', 'baseline', 'us/record', 'change'))
+        for case, name, before, value, change in rows:
+            print('{:<16}{:<26}{:>12}{:>12}{:>+8.0%}'.format(
+                case, name, before, value, change))
+        if regressed:
+            sys.exit(1)
+    else:
+        print(json.dumps(results, indent=2))
+
+    if args.save:
+        with open(args.save, 'w') as f:
+            json.dump(results, f, indent=2, sort_keys=True)
+            f.write('\n')
+
+
+if __name__ == '__main__':
+    main()
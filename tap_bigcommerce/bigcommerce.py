@@ -38,6 +38,11 @@ once. Then, in a final loop, the nested resource result is resolved.
 
 In testing, this created a 10-fold increase in speed.
 
+Nested resource collections are paginated too (an order can have
+hundreds of products). Each nested collection is requested 250 items at
+a time, and a follow-up page is requested as soon as a full page
+arrives, alongside the other rows' requests.
+
 API Rate Limit:
 
 In order to accomodate rate limit restrictions for asyncrounous requests,
@@ -59,13 +64,20 @@ allow an entire page of results to be processed within one window.
 
 import time
 import math
+import json
+import itertools
 
 from concurrent.futures import Future
+from requests import Session
 from requests_futures.sessions import FuturesSession
 from requests.exceptions import HTTPError
 from singer.utils import strptime_to_utc, strftime
 from singer import get_logger
 
+from tap_bigcommerce.scheduler import PRIMARY, NESTED, BACKGROUND
+from tap_bigcommerce.deadline import DeadlineReached
+from tap_bigcommerce import trace
+
 
 logger = get_logger().getChild('tap-bigcommerce')
 
@@ -116,6 +128,65 @@ def transform_dates(obj, date_fields=[]):
     return _transform(obj)
 
 
+def map_order_consignments(order):
+    """
+    Fill the `products` and `shipping_addresses` of an order requested
+    with `include=consignments.line_items` from its consignments, so
+    their stubs aren't followed. Stubs are kept for anything the
+    consignments don't cover, or if the consignments are themselves a
+    stub (the include wasn't honoured), and the `coupons` stub is only
+    followed for orders with a coupon discount.
+    """
+    order = dict(order)
+    consignments = order.pop('consignments', None)
+
+    if type(consignments) == dict:
+        consignments = [consignments]
+    if type(consignments) != list:
+        consignments = []
+
+    groups = [
+        group for group in consignments
+        if type(group) == dict and 'resource' not in group
+    ]
+
+    if groups:
+        products = {}
+        addresses = []
+        for group in groups:
+            for kind, entries in group.items():
+                if type(entries) == dict:
+                    entries = [entries]
+                if type(entries) != list:
+                    continue
+                for entry in entries:
+                    if type(entry) != dict:
+                        continue
+                    for item in entry.get('line_items') or []:
+                        products[item.get('id')] = item
+                    if kind == 'shipping':
+                        address = {
+                            k: v for k, v in entry.items()
+                            if k != 'line_items'
+                        }
+                        address.setdefault('order_id', order.get('id'))
+                        addresses.append(address)
+
+        if products:
+            order['products'] = list(products.values())
+        order['shipping_addresses'] = addresses
+
+    coupons = order.get('coupons')
+    if type(coupons) == dict and 'resource' in coupons:
+        try:
+            if float(order.get('coupon_discount') or 0) == 0:
+                order['coupons'] = []
+        except (TypeError, ValueError):
+            pass
+
+    return order
+
+
 def unpack_nested_resources(get, exclude_fields=[], asyncronous=True):
     """
     Returns a function that will recursively "unpack" an object
@@ -143,6 +214,18 @@ def unpack_nested_resources(get, exclude_fields=[], asyncronous=True):
     return unpack
 
 
+def nested_stubs(row, exclude_paths=[]):
+    """
+    Top level fields of a row that are nested resource stubs and will be
+    requested when the row is unpacked.
+    """
+    return [
+        key for key, value in row.items()
+        if type(value) == dict and 'resource' in value and
+        (key,) not in exclude_paths
+    ]
+
+
 def resolve_resources(row, parent_key=()):
     """
     Recurisvely traverse object and Resolve any field values
@@ -175,6 +258,9 @@ class Bigcommerce():
 
     results_per_page = 50
 
+    # largest page size allowed for nested resource collections
+    nested_results_per_page = 250
+
     max_retries = 5
 
     retry_window = 300
@@ -201,6 +287,30 @@ class Bigcommerce():
                 ('shipping_addresses', 'shipping_quotes')
             ]
         },
+        'orders_consignments': {
+            'version': 2,
+            'path': 'orders',
+            'stream': 'orders',
+            'transform_date_fields': [
+                'date_modified',
+                'date_created',
+                'date_shipped'
+            ],
+            # orders without consignments still follow all three stubs,
+            # so pages are sized for that; a page's request need is
+            # counted from the stubs left after `map_row`
+            'sub_resources': 3,
+            'params': {
+                'include': 'consignments.line_items'
+            },
+            'map_row': map_order_consignments,
+            'exclude_paths': [
+                ('credit_card_type',),
+                ('products', 'configurable_fields'),
+                ('products', 'fulfillment_source'),
+                ('shipping_addresses', 'shipping_quotes')
+            ]
+        },
         'customers': {
             'version': 2,
             'path': 'customers',
@@ -213,9 +323,34 @@ class Bigcommerce():
                 ('addresses',)
             ]
         },
+        'customers_v3': {
+            'version': 3,
+            'path': 'customers',
+            'stream': 'customers',
+            'transform_date_fields': [
+                'date_modified',
+                'date_created'
+            ],
+            'sub_resources': 0,
+            'results_per_page': 250,
+            # addresses and attributes aren't part of the customers schema
+            'params': {
+                'include': 'formfields'
+            }
+        },
         'products': {
             'version': 3,
             'path': 'catalog/products',
+            # supports `include_fields` projection
+            'include_fields': True
+        },
+        # products with one sub-resource `include`d, read by the product
+        # child streams (see BigCommerce.product_children)
+        'product_children': {
+            'version': 3,
+            'path': 'catalog/products',
+            'results_per_page': 250,
+            'include_fields': True
         },
         'coupons': {
             'version': 2,
@@ -223,10 +358,46 @@ class Bigcommerce():
             'transform_date_fields': [
                 'date_created',
                 'expires'
-            ]
+            ],
+            # pages are requested conditionally if an http cache is set
+            'conditional_get': True
         }
     }
 
+    # optional tap_bigcommerce.parallel.TransformPool
+    transform_pool = None
+
+    # optional tap_bigcommerce.budget.SharedBudget
+    budget = None
+
+    # optional tap_bigcommerce.hedging.Hedger, used for nested resources
+    hedger = None
+
+    # seconds to wait for a response (see requests' `timeout`)
+    timeout = None
+
+    # optional tap_bigcommerce.memory.MemoryGuard
+    memory_guard = None
+
+    # optional tap_bigcommerce.nested_cache.NestedResourceCache
+    nested_cache = None
+
+    # optional tap_bigcommerce.http_cache.HttpCache
+    http_cache = None
+
+    # optional tap_bigcommerce.scheduler.PriorityScheduler, and the
+    # stream requests are currently made for
+    scheduler = None
+    stream_name = None
+
+    # optional tap_bigcommerce.trace.Tracer, and the span id of the page
+    # being fetched, the parent of its nested resource requests
+    tracer = None
+    trace_parent = None
+
+    # optional tap_bigcommerce.deadline.Deadline
+    deadline = None
+
     rate_limit = {
         "ms_until_reset": None,
         "window_size_ms": None,
@@ -234,13 +405,19 @@ class Bigcommerce():
         "requests_quota": None
     }
 
-    def __init__(self, client_id, access_token, store_hash):
-
+    def __init__(self, client_id, access_token, store_hash,
+                 executor=None, adapter=None):
+        """
+        `executor` and `adapter` allow several stores to share one
+        request thread pool and HTTP connection pool (multi-store mode).
+        """
         self.retries = 0
         self.last_retry = None
         self.client_id = client_id
         self.access_token = access_token
         self.store_hash = store_hash
+        self.executor = executor
+        self.adapter = adapter
 
         self.base_url = self.base_url + self.store_hash + '/v{version}'
 
@@ -255,7 +432,9 @@ class Bigcommerce():
         an API error and the session needs to be reset.
         """
         self.request_count = 0
-        self.session = FuturesSession()
+        self.session = FuturesSession(executor=self.executor)
+        if self.adapter is not None:
+            self.session.mount('https://', self.adapter)
 
         self.session.hooks['response'] = self._response_hook
 
@@ -275,16 +454,27 @@ class Bigcommerce():
         self.request_count += 1
         if 'X-Rate-Limit-Time-Reset-Ms' in resp.headers:
             self.rate_limit = self._update_rate_limit(resp.headers)
+            if self.budget is not None:
+                self.budget.observe(self.rate_limit)
 
         if resp.status_code != 200:
             if resp.status_code == 204:
                 resp.data = []
+            elif resp.status_code == 304 and self.http_cache is not None \
+                    and self.http_cache.tracks(resp.request.url):
+                body = self.http_cache.body(resp.request.url)
+                if body is None:
+                    raise HTTPError(resp)
+                resp.data = json.loads(body)
             elif resp.status_code == 429:
                 raise BigCommerceRateLimitException(resp)
             else:
                 raise HTTPError(resp)
         else:
             resp.data = resp.json()
+            if self.http_cache is not None and \
+                    self.http_cache.tracks(resp.request.url):
+                self.http_cache.store(resp.request.url, resp)
 
     def _update_rate_limit(self, headers):
         """
@@ -302,6 +492,17 @@ class Bigcommerce():
             rate_limit[key] = int(headers[header])
         return rate_limit
 
+    def sleep(self, seconds):
+        """
+        All waiting for the rate limit goes through here, so a virtual
+        clock can be injected (see `tap_bigcommerce.simulator`).
+        """
+        start = time.time()
+        time.sleep(seconds)
+        if self.tracer is not None:
+            self.tracer.record('sleep', start, time.time(),
+                               parent=self.trace_parent, seconds=seconds)
+
     def make_url(self, version=2, *res):
         """
         Make a valid URL based on the API version and paths provided
@@ -311,7 +512,8 @@ class Bigcommerce():
             url = '{}/{}'.format(url, r)
         return url
 
-    def get(self, url, params={}, resolve=False):
+    def get(self, url, params={}, resolve=False, hedge=False,
+            conditional=False, priority=PRIMARY):
         """
         Make a get request.
 
@@ -321,98 +523,581 @@ class Bigcommerce():
             resolve (bool): if True, resolve future before returning
                             (making method blocking), otherwise
                             return Future
+            hedge (bool): if True and a hedger is set, send a duplicate
+                          request if this one is slow
+            conditional (bool): if True and an http cache is set, send
+                                the cached validators and serve a 304
+                                response from the cache
+            priority (int): scheduling class if a scheduler is set, see
+                            `tap_bigcommerce.scheduler`
 
         Returns:
             requests.Response
             OR
             concurrent.futures.Future
         """
-        future = self.session.get(url, params=params, headers=self.headers)
+        headers = self.headers
+        if conditional and self.http_cache is not None:
+            headers = {**headers, **self.http_cache.validators(url, params)}
+
+        def send():
+            return Session.request(
+                self.session, 'GET', url, params=params, headers=headers,
+                timeout=self.timeout
+            )
+
+        if self.tracer is not None:
+            send = self._traced(send, url, params)
+
+        if hedge and self.hedger is not None:
+            future = self.hedger.submit(
+                self.executor_for(priority),
+                send,
+                allow=self._can_hedge,
+                hedge_executor=self.executor_for(BACKGROUND)
+            )
+        elif self.scheduler is not None or self.tracer is not None:
+            future = self.executor_for(priority).submit(send)
+        else:
+            future = self.session.get(
+                url, params=params, headers=headers,
+                timeout=self.timeout
+            )
 
         if resolve:
             return future.result()
         else:
             return future
 
-    def resource(self, name, params={}, async_sub_resources=True):
+    def executor_for(self, priority):
+        """
+        Executor for requests of a scheduling class: a lane of the
+        scheduler if one is set, otherwise the session's executor.
+        """
+        if self.scheduler is None:
+            return self.session.executor
+        return self.scheduler.lane(
+            priority, (self.store_hash, self.stream_name))
+
+    def _traced(self, send, url, params):
+        """
+        Wrap `send` to record a span each time it is called, from the
+        thread that sends the request. Hedged requests are sent more
+        than once, so each attempt gets its own span.
+        """
+        submitted = time.time()
+        parent = self.trace_parent
+        attempts = itertools.count(1)
+
+        def traced():
+            attempt = next(attempts)
+            start = time.time()
+            resp = None
+            exception = None
+            try:
+                resp = send()
+                return resp
+            except Exception as e:
+                exception = e
+                resp = e.args[0] if e.args else None
+                raise
+            finally:
+                self.tracer.record(
+                    'GET', start, time.time(),
+                    parent=parent,
+                    url=trace.url_template(url),
+                    page=params.get('page'),
+                    attempt=attempt,
+                    status=getattr(resp, 'status_code', None),
+                    bytes=len(getattr(resp, 'content', None) or b''),
+                    queued_ms=round((start - submitted) * 1000, 3),
+                    error=None if exception is None else str(exception)
+                )
+
+        return traced
+
+    def get_nested(self, url, params={}):
+        """
+        Request every page of a nested resource collection, returning a
+        Future for a response whose data holds all of the pages.
+
+        Each follow-up page is requested from the previous page's
+        callback, so a long collection doesn't hold up the requests for
+        the other rows on the page. These are idempotent GETs, so they
+        may be hedged.
+        """
+        limit = self.nested_results_per_page
+        result = Future()
+        items = []
+
+        def request(page):
+            future = self.get(
+                url, {**params, **{'page': page, 'limit': limit}},
+                hedge=True, priority=NESTED
+            )
+            future.add_done_callback(lambda f: on_page(page, f))
+
+        def on_page(page, future):
+            try:
+                response = future.result()
+                if type(response.data) != list:
+                    result.set_result(response)
+                    return
+                items.extend(response.data)
+                if len(response.data) < limit:
+                    response.data = items
+                    result.set_result(response)
+                else:
+                    request(page + 1)
+            except Exception as e:
+                result.set_exception(e)
+
+        request(1)
+        return result
+
+    def _can_hedge(self):
+        """
+        Don't spend requests on hedges when the window is nearly used up.
+        """
+        remaining = self.rate_limit['requests_remaining']
+        if remaining is None:
+            return True
+        return remaining > (self.rate_limit['requests_quota'] or 0) * 0.1
+
+    def _from_nested_cache(self, name, rows, exclude_paths):
+        """
+        Replace the nested resource stubs of unchanged rows with their
+        cached data.
+
+        Returns the rows and, for each row, the nested resource fields
+        that still need to be requested (and cached once resolved), or
+        None if the row was served from the cache.
+        """
+        result = []
+        nested_keys = []
+        for row in rows:
+            keys = nested_stubs(row, exclude_paths)
+            cached = self.nested_cache.get(name, row) if keys else None
+            if cached is not None and all(k in cached for k in keys):
+                row = {**row, **{k: cached[k] for k in keys}}
+                keys = None
+            result.append(row)
+            nested_keys.append(keys)
+        return result, nested_keys
+
+    def row_transform(self, name):
+        """
+        The excluded paths and date fields applied to rows of a resource.
+        """
+        resource = self.endpoints.get(name, {})
+        return (
+            resource.get('exclude_paths', []),
+            resource.get('transform_date_fields', [])
+        )
+
+    def passthrough(self, name):
+        """
+        True if rows of a resource have no nested resources, excluded
+        paths, date fields or row mapping, so they can be yielded as
+        parsed instead of being copied by unpack, resolve and transform.
+        """
+        resource = self.endpoints.get(name, {})
+        return not (
+            resource.get('sub_resources') or
+            resource.get('transform_date_fields') or
+            resource.get('exclude_paths') or
+            resource.get('map_row')
+        )
+
+    def page_size(self, name):
+        """
+        Results per page for a resource, adjusted based on number of sub
+        resources and the request quota set by the initial authorization
+        check request.
+        """
+        resource = self.endpoints.get(name, {})
+        sub_resources = resource.get('sub_resources', 0)
+        results_per_page = resource.get(
+            'results_per_page', self.results_per_page)
+
+        if sub_resources > 0:
+            return min(
+                results_per_page,
+                math.floor(
+                    self.rate_limit['requests_quota'] / sub_resources
+                ) - 5
+            )
+
+        return results_per_page
+
+    def count(self, name, params={}):
+        """
+        Total number of results for a resource. Version 2 resources have
+        a `/count` endpoint, version 3 resources report a pagination
+        total, so a single result is requested.
+
+        Returns:
+            (int, float): count and the request latency in seconds
+        """
+        resource = self.endpoints.get(name, {})
+        version = resource.get('version', 3)
+        path = resource.get('path', name)
+
+        if version == 2:
+            r = self.get(self.make_url(version, path, 'count'), params,
+                         resolve=True)
+            total = r.data.get('count', 0) if r.data else 0
+        else:
+            r = self.get(self.make_url(version, path),
+                         {**params, **{'limit': 1}}, resolve=True)
+            total = r.data.get('meta', {}).get(
+                'pagination', {}).get('total', 0)
+
+        return total, r.elapsed.total_seconds()
+
+    def wait_for_requests(self, requests):
+        """
+        Wait until `requests` requests are available in the rate limit
+        window (or reserved from the shared budget).
+        """
+        if self.budget is not None:
+            self.budget.wait_for(requests, sleep=self.sleep)
+            return
+
+        remaining = self.rate_limit['requests_remaining']
+        if remaining is not None and remaining - requests < 1:
+            sec = self.rate_limit['ms_until_reset'] / 1000
+            logger.warning((
+                "Not enough requests available to complete request. "
+                "Waiting {:.2f} sec"
+            ).format(sec))
+            self.request_count = 0
+            self.sleep(sec)
+
+    def resource_by_ids(self, name, ids, fields=None):
+        """
+        Iterate through the rows of a resource with the given `ids`.
+
+        Version 2 rows are requested concurrently, one id per request,
+        and ids that no longer exist are skipped. Version 3 rows are
+        requested in `id:in` batches.
+        """
+        resource = self.endpoints.get(name, {})
+        version = resource.get('version', 3)
+        path = resource.get('path', name)
+        date_fields = resource.get('transform_date_fields', [])
+        exclude_paths = resource.get('exclude_paths', [])
+        self.stream_name = resource.get('stream', name)
+        sub_resources = resource.get('sub_resources', 0)
+        params = dict(resource.get('params', {}))
+        if fields and resource.get('include_fields'):
+            params['include_fields'] = ','.join(sorted(fields))
+
+        unpack_resources = unpack_nested_resources(
+            self.get_nested, exclude_paths)
+
+        ids = list(ids)
+        batch_size = self.ids_batch_size(name)
+        while ids:
+            batch, ids = ids[:batch_size], ids[batch_size:]
+            requests_need = len(batch) * sub_resources + (
+                len(batch) if version == 2 else 1)
+            self.wait_for_requests(requests_need)
+
+            if version == 2:
+                rows, failed = self._rows_by_id(
+                    name, self.make_url(version, path), batch, params,
+                    resource.get('map_row'), unpack_resources)
+            else:
+                try:
+                    r = self.get(self.make_url(version, path), {
+                        **params,
+                        'id:in': ','.join(str(id) for id in batch),
+                        'limit': len(batch)
+                    }).result()
+                    rows = r.data.get('data', [])
+                    if resource.get('map_row'):
+                        rows = [resource['map_row'](row) for row in rows]
+                    rows = [unpack_resources(row) for row in rows if row]
+                    rows = [resolve_resources(row) for row in rows]
+                    failed = []
+                except BigCommerceRateLimitException:
+                    rows, failed = [], batch
+
+            for row in rows:
+                yield transform_dates(
+                    filter_excluded_paths(row, exclude_paths),
+                    date_fields)
+
+            if failed:
+                delay = (self.rate_limit['window_size_ms'] / 1000)
+                logger.error((
+                    "BigCommerce rate limit exceeded. "
+                    "Waiting {:.2f}"
+                ).format(delay))
+                self.sleep(delay + 1)
+                # retry only the ids that were rate limited
+                ids = failed + ids
+
+    def ids_batch_size(self, name):
+        """
+        Ids requested at once by `resource_by_ids`. Version 2 rows cost
+        one request each plus their sub resources, so a batch is sized
+        to fit in one rate limit window.
+        """
+        resource = self.endpoints.get(name, {})
+        page_size = self.page_size(name)
+        quota = self.rate_limit.get('requests_quota')
+        if resource.get('version', 3) != 2 or not quota:
+            return page_size
+
+        sub_resources = resource.get('sub_resources', 0)
+        return max(1, min(
+            page_size,
+            math.floor(quota / (1 + sub_resources)) - 5
+        ))
+
+    def _rows_by_id(self, name, url, ids, params, map_row, unpack):
+        """
+        Request version 2 rows and their sub resources concurrently, one
+        id per request. Returns the resolved rows and the ids that were
+        rate limited. Ids that no longer exist are skipped.
+        """
+        futures = [
+            (id, self.get('{}/{}'.format(url, id), params)) for id in ids
+        ]
+
+        failed = []
+        unpacked = []
+        for id, future in futures:
+            try:
+                row = future.result().data
+            except BigCommerceRateLimitException:
+                failed.append(id)
+                continue
+            except HTTPError as e:
+                if getattr(e.args[0], 'status_code', None) != 404:
+                    raise
+                logger.warning("%s %s not found, skipping", name, id)
+                continue
+            if not row:
+                continue
+            if map_row:
+                row = map_row(row)
+            unpacked.append((id, unpack(row)))
+
+        rows = []
+        for id, row in unpacked:
+            try:
+                rows.append(resolve_resources(row))
+            except BigCommerceRateLimitException:
+                failed.append(id)
+
+        return rows, failed
+
+    def resource(self, name, params={}, async_sub_resources=True,
+                 cursor=None, fields=None, stream=None):
+        """
+        Iterate through every page of results for a resource.
+
+        Requests are attributed (for scheduling weights and tracing) to
+        `stream`, or to the endpoint's stream if not given.
+
+        If `fields` is a list of top level fields and the endpoint
+        supports it, only those fields are requested (v3 `include_fields`).
+
+        If a `cursor` dict is provided, iteration starts at
+        `cursor['page']` and rows for which `cursor['skip'](row)` is
+        true are dropped before their sub-resources are requested. The
+        cursor's `page` and `limit` are updated as pages are fetched so
+        the caller can checkpoint its position.
+
+        If a deadline is set, `DeadlineReached` is raised instead of
+        requesting a page that might not finish in time, once every row
+        of the previous page has been yielded.
+        """
+        cursor = cursor if cursor is not None else {}
+        skip = cursor.get('skip')
+
         resource = self.endpoints.get(name, {})
         version = resource.get('version', 3)
         path = resource.get('path', name)
         date_fields = resource.get('transform_date_fields', [])
         exclude_paths = resource.get('exclude_paths', [])
+        self.stream_name = stream or resource.get('stream', name)
         url = self.make_url(version, path)
+        params = {**resource.get('params', {}), **params}
+        if fields and resource.get('include_fields'):
+            params['include_fields'] = ','.join(sorted(fields))
 
         unpack_resources = unpack_nested_resources(
-            self.get,
+            self.get_nested,
             exclude_paths,
             async_sub_resources
         )
 
         sub_resources = resource.get('sub_resources', 0)
+        passthrough = self.passthrough(name)
 
-        # adjust results per page based on number of sub resources and
-        # the request quota set by the initial authorization check request
-        if sub_resources > 0:
-            self.results_per_page = min(
-                self.results_per_page,
-                math.floor(
-                    self.rate_limit['requests_quota'] / sub_resources
-                ) - 5
-            )
+        results_per_page = self.page_size(name)
 
-        requests_need = self.results_per_page * sub_resources
+        requests_need = results_per_page * sub_resources
 
-        page = 0
+        page = cursor.get('page') or 1
+        # page numbers from a checkpoint written with a different page
+        # size are converted, rounding down so no rows are missed
+        if cursor.get('limit') and cursor['limit'] != results_per_page:
+            page = math.floor(
+                (page - 1) * cursor['limit'] / results_per_page
+            ) + 1
+        cursor['limit'] = results_per_page
+
+        # rows at the start of the next page that were already yielded
+        # before the page size changed
+        discard = 0
+        scale = 1.0
+        # time the last page took to fetch and emit
+        page_seconds = 0
+
+        page -= 1
         while True:
             error_count = 0
             page += 1
 
+            if self.deadline is not None and \
+                    self.deadline.reached(page_seconds):
+                raise DeadlineReached(
+                    "{} stopped before page {}".format(name, page))
+            page_started = time.time()
+
+            if self.memory_guard is not None:
+                scale = self.memory_guard.scale()
+                limit = max(1, int(self.page_size(name) * scale))
+                if limit != results_per_page:
+                    # carry on from the same row with the new page size
+                    offset = (page - 1) * results_per_page + discard
+                    page = offset // limit + 1
+                    discard = offset % limit
+                    results_per_page = cursor['limit'] = limit
+                    requests_need = results_per_page * sub_resources
+
+            cursor['page'] = page
+
+            if self.tracer is not None:
+                page_start = time.time()
+                self.trace_parent = self.tracer.next_id()
+
             params = {**params, **{
                 'page': page,
-                'limit': self.results_per_page
+                'limit': results_per_page
             }}
 
+            # reserve the page and its sub resources from the budget
+            # shared with other processes syncing the same store
+            if self.budget is not None:
+                self.budget.wait_for(1 + requests_need, sleep=self.sleep)
+
             try:
-                r = self.get(url, params).result()
+                r = self.get(
+                    url, params,
+                    conditional=resource.get('conditional_get', False)
+                ).result()
             except BigCommerceRateLimitException as e:
                 delay = (self.rate_limit['window_size_ms'] / 1000)
                 logger.error((
                     "BigCommerce rate limit exceeded. "
                     "Waiting {:.2f}"
                 ).format(delay))
-                time.sleep(delay + 1)
+                self.sleep(delay + 1)
                 # retry the same page
                 page -= 1
                 continue
 
-            if self.rate_limit['requests_remaining'] is not None:
-                if (self.rate_limit['requests_remaining'] - requests_need) < 1:
+            data = r.data if version == 2 else r.data.get('data', [])
+            rows = data[discard:]
+            if skip is not None:
+                rows = [row for row in rows if not skip(row)]
+            if resource.get('map_row'):
+                rows = [resource['map_row'](row) for row in rows]
+
+            # nested resources of unchanged rows are served from the cache
+            nested_keys = [[]] * len(rows)
+            page_requests_need = requests_need
+            if self.nested_cache is not None and sub_resources:
+                rows, nested_keys = self._from_nested_cache(
+                    name, rows, exclude_paths)
+                page_requests_need = sum(
+                    len(keys) for keys in nested_keys if keys)
+            elif resource.get('map_row') and sub_resources:
+                # mapping can fill some of the stubs from the row itself
+                page_requests_need = sum(
+                    len(nested_stubs(row, exclude_paths)) for row in rows)
+
+            if self.budget is None and \
+                    self.rate_limit['requests_remaining'] is not None:
+                if (self.rate_limit['requests_remaining'] -
+                        page_requests_need) < 1:
                     sec = self.rate_limit['ms_until_reset'] / 1000
+                    # this page's rows haven't been yielded yet
+                    if self.deadline is not None and \
+                            self.deadline.reached(sec + page_seconds):
+                        raise DeadlineReached(
+                            "{} stopped before page {}".format(name, page))
                     logger.warning((
                         "Not enough requests available to complete request. "
                         "Waiting {:.2f} sec"
                     ).format(sec))
                     self.request_count = 0
-                    time.sleep(sec)
+                    self.sleep(sec)
 
-            data = r.data if version == 2 else r.data.get('data', [])
-            # unpack nested resources for entire page of results
-            data = unpack_resources(data)
+            # unpack nested resources for the entire page of results, or
+            # for a part of it at a time when memory is short
+            batch_size = max(1, int(len(rows) * scale))
 
             try:
-                for row in data:
-                    yield transform_dates(
-                        filter_excluded_paths(
-                            resolve_resources(row),
-                            exclude_paths),
-                        date_fields)
+                if passthrough:
+                    for row in rows:
+                        yield row
+                    rows = []
+
+                for start in range(0, len(rows), batch_size):
+                    end = start + batch_size
+                    # rows served from the cache are already complete
+                    batch = [
+                        row if keys is None else unpack_resources(row)
+                        for row, keys in zip(
+                            rows[start:end], nested_keys[start:end])
+                    ]
+                    batch = [resolve_resources(row) for row in batch]
+
+                    if self.nested_cache is not None:
+                        for row, keys in zip(batch, nested_keys[start:end]):
+                            if keys:
+                                self.nested_cache.put(
+                                    name, row, {k: row[k] for k in keys})
+
+                    if self.transform_pool is not None:
+                        # rows are filtered and transformed in the pool
+                        # along with the Transformer (see
+                        # `sync_records_in_pool`); top level dates are
+                        # transformed here as they are bookmarked
+                        for row in batch:
+                            yield {**row, **transform_dates(
+                                {k: row[k] for k in date_fields if k in row},
+                                date_fields)}
+                        continue
+
+                    for row in batch:
+                        yield transform_dates(
+                            filter_excluded_paths(row, exclude_paths),
+                            date_fields)
             except BigCommerceRateLimitException as e:
                 delay = (self.rate_limit['window_size_ms'] / 1000)
                 logger.error((
                     "BigCommerce rate limit exceeded. "
                     "Waiting {:.2f}"
                 ).format(delay))
-                time.sleep(delay + 1)
+                self.sleep(delay + 1)
                 # retry the same page
                 page -= 1
                 continue
@@ -421,13 +1106,25 @@ class Bigcommerce():
                 logger.warning(
                     "Error {} occurred. Sleeping for 10 seconds.".format(e)
                 )
-                time.sleep(10)
+                self.sleep(10)
                 # max 4 errors in any single page of results
                 if error_count > 3:
                     logger.error("{} errors, ending".format(error_count))
                     raise e
 
+            discard = 0
+            page_seconds = time.time() - page_started
+            if self.nested_cache is not None:
+                self.nested_cache.commit()
+
+            if self.tracer is not None:
+                self.tracer.record(
+                    'page', page_start, time.time(),
+                    span_id=self.trace_parent, resource=name,
+                    stream=self.stream_name, page=page, rows=len(data))
+                self.trace_parent = None
+
             # assume results page with fewer values than `results_per_page` =
             # no more results
-            if len(data) < self.results_per_page:
+            if len(data) < results_per_page:
                 break
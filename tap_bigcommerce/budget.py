@@ -0,0 +1,161 @@
+#!/usr/bin/env python
+"""
+Rate limit budget shared between tap processes.
+
+BigCommerce's quota is per store, but each `Bigcommerce` instance only
+knows about the requests it made itself. When several taps run against
+the same store at once they exhaust the window between them and all hit
+429s. `SharedBudget` keeps the current window for a store in a local
+SQLite database: every process reserves requests from it before making
+them, and every response's `X-Rate-Limit-*` headers are written back so
+all processes see the latest observation.
+"""
+import time
+import sqlite3
+import threading
+
+import singer
+
+
+logger = singer.get_logger().getChild('tap-bigcommerce')
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS budgets (
+    store_hash TEXT PRIMARY KEY,
+    window_end_ms INTEGER NOT NULL,
+    window_size_ms INTEGER NOT NULL,
+    requests_quota INTEGER NOT NULL,
+    requests_remaining INTEGER NOT NULL
+)
+"""
+
+# observations whose window ends this much later than the stored window
+# belong to a new window
+WINDOW_TOLERANCE_MS = 1000
+
+
+def now_ms():
+    return int(time.time() * 1000)
+
+
+class SharedBudget():
+
+    def __init__(self, path, store_hash, clock=now_ms):
+        self.path = path
+        self.store_hash = store_hash
+        self.clock = clock
+        self.lock = threading.Lock()
+        self.connection = sqlite3.connect(
+            path,
+            timeout=30,
+            isolation_level=None,
+            check_same_thread=False
+        )
+        self.connection.execute(SCHEMA)
+
+    def _transaction(self, fn):
+        with self.lock:
+            cursor = self.connection.cursor()
+            cursor.execute('BEGIN IMMEDIATE')
+            try:
+                result = fn(cursor)
+                cursor.execute('COMMIT')
+                return result
+            except Exception:
+                cursor.execute('ROLLBACK')
+                raise
+
+    def _load(self, cursor):
+        cursor.execute(
+            'SELECT window_end_ms, window_size_ms, requests_quota, '
+            'requests_remaining FROM budgets WHERE store_hash = ?',
+            (self.store_hash,)
+        )
+        return cursor.fetchone()
+
+    def _save(self, cursor, window_end, window_size, quota, remaining):
+        cursor.execute(
+            'INSERT OR REPLACE INTO budgets VALUES (?, ?, ?, ?, ?)',
+            (self.store_hash, window_end, window_size, quota, remaining)
+        )
+
+    def observe(self, rate_limit):
+        """
+        Record the rate limit parsed from a response's headers.
+        """
+        if rate_limit.get('ms_until_reset') is None:
+            return
+
+        def update(cursor):
+            window_end = self.clock() + rate_limit['ms_until_reset']
+            remaining = rate_limit['requests_remaining']
+            row = self._load(cursor)
+            if row is not None and \
+                    window_end <= row[0] + WINDOW_TOLERANCE_MS:
+                # same window - other processes may have reserved
+                # requests the API hasn't seen yet
+                remaining = min(remaining, row[3])
+                window_end = row[0]
+            self._save(
+                cursor,
+                window_end,
+                rate_limit['window_size_ms'],
+                rate_limit['requests_quota'],
+                remaining
+            )
+
+        self._transaction(update)
+
+    def reserve(self, requests):
+        """
+        Try to reserve `requests` from the current window.
+
+        Returns 0 if the requests were reserved, otherwise the number
+        of seconds until the window resets.
+        """
+        def update(cursor):
+            row = self._load(cursor)
+            if row is None:
+                # nothing observed yet
+                return 0
+
+            window_end, window_size, quota, remaining = row
+            now = self.clock()
+            if now >= window_end:
+                window_end = now + window_size
+                remaining = quota
+
+            needed = min(requests, quota)
+            if remaining - needed < 0:
+                return (window_end - now) / 1000
+
+            self._save(
+                cursor, window_end, window_size, quota, remaining - needed
+            )
+            return 0
+
+        return self._transaction(update)
+
+    def wait_for(self, requests, sleep=time.sleep):
+        """
+        Block until `requests` have been reserved.
+        """
+        while True:
+            wait = self.reserve(requests)
+            if wait <= 0:
+                return
+            logger.warning((
+                "Shared rate limit budget exhausted. "
+                "Waiting {:.2f} sec"
+            ).format(wait))
+            sleep(wait)
+
+    def close(self):
+        self.connection.close()
+
+
+def shared_budget_from_config(config, store_hash):
+    if not config.get('rate_limit_db'):
+        return None
+
+    return SharedBudget(config['rate_limit_db'], store_hash)
@@ -15,7 +15,8 @@ def validate(method):
     @wraps(method)
     def _validate(*args, **kwargs):
         if 'replication_key' in kwargs and \
-                kwargs['replication_key'] not in ['date_modified', 'id']:
+                kwargs['replication_key'] not in [
+                    'date_modified', 'id', 'product_date_modified']:
                 raise Exception("Client Error - invalid replication_key")
 
         if 'bookmark' in kwargs and \
@@ -54,6 +55,50 @@ def parse_date_string_arguments(fields):
     return decorator
 
 
+# product child streams and the product sub-resource each one reads
+PRODUCT_CHILDREN = {
+    'product_variants': 'variants',
+    'product_images': 'images',
+    'product_custom_fields': 'custom_fields',
+    'product_modifiers': 'modifiers'
+}
+
+
+def map_customer_v3(customer):
+    """
+    Map a v3 customer onto the v2 shape of the customers schema.
+    """
+    store_credit = sum(
+        float(credit.get('amount') or 0)
+        for credit in customer.get('store_credit_amounts') or []
+    )
+
+    return {
+        'id': customer.get('id'),
+        'company': customer.get('company'),
+        'first_name': customer.get('first_name'),
+        'last_name': customer.get('last_name'),
+        'email': customer.get('email'),
+        'phone': customer.get('phone'),
+        'date_created': customer.get('date_created'),
+        'date_modified': customer.get('date_modified'),
+        'store_credit': store_credit,
+        'registration_ip_address': customer.get('registration_ip_address'),
+        'customer_group_id': customer.get('customer_group_id'),
+        'notes': customer.get('notes'),
+        'tax_exempt_category': customer.get('tax_exempt_category'),
+        'accepts_marketing': customer.get(
+            'accepts_product_review_abandoned_cart_emails'),
+        'form_fields': [
+            {'name': field.get('name'), 'value': field.get('value')}
+            for field in customer.get('form_fields') or []
+        ],
+        'reset_pass_on_login': (
+            customer.get('authentication') or {}
+        ).get('force_password_reset')
+    }
+
+
 class Client():
 
     authorized = False
@@ -64,10 +109,16 @@ class Client():
 
 class BigCommerce(Client):
 
-    def __init__(self, client_id, access_token, store_hash):
+    def __init__(self, client_id, access_token, store_hash,
+                 executor=None, adapter=None, customers_version=2,
+                 orders_expansion=None):
         self.client_id = client_id
         self.access_token = access_token
         self.store_hash = store_hash
+        self.customers_version = int(customers_version)
+        self.orders_expansion = orders_expansion
+        self.executor = executor
+        self.adapter = adapter
         self.utcnow = singer.utils.now()
         self._reset_session()
 
@@ -76,13 +127,55 @@ class BigCommerce(Client):
             self.api = Bigcommerce(
                 client_id=self.client_id,
                 store_hash=self.store_hash,
-                access_token=self.access_token
+                access_token=self.access_token,
+                executor=self.executor,
+                adapter=self.adapter
             )
             self.authorized = True
         except Exception as e:
             self.authorized = False
             raise e
 
+    def resource_name(self, name):
+        """
+        Name of the API endpoint used for a stream.
+        """
+        if name == 'customers' and self.customers_version == 3:
+            return 'customers_v3'
+        if name == 'orders' and self.orders_expansion == 'consignments':
+            return 'orders_consignments'
+        if name in PRODUCT_CHILDREN:
+            return 'product_children'
+        return name
+
+    def count(self, name, bookmark=None):
+        """
+        Count results for a stream from `bookmark` onwards.
+
+        Returns:
+            (int, float): count and the request latency in seconds
+        """
+        name = self.resource_name(name)
+        params = {}
+        if bookmark is not None:
+            key = 'date_modified:min' \
+                if self.api.endpoints.get(name, {}).get('version', 3) == 3 \
+                else 'min_date_modified'
+            params[key] = parse(bookmark).isoformat()
+
+        return self.api.count(name, params)
+
+    def by_ids(self, name, ids, fields=None):
+        """
+        Rows of a stream with the given ids, mapped like the stream's
+        incremental rows.
+        """
+        resource = self.resource_name(name)
+        for row in self.api.resource_by_ids(resource, ids, fields=fields):
+            if resource == 'customers_v3':
+                row = map_customer_v3(row)
+            yield row
+
     def iterdates(self, start_date):
         for n in range(max(int((self.utcnow - start_date).days), 1)):
             start = start_date + timedelta(n)
@@ -91,39 +184,113 @@ class BigCommerce(Client):
 
     @parse_date_string_arguments('bookmark')
     @validate
-    def orders(self, replication_key, bookmark):
-
-        for order in self.api.resource('orders', {
+    def orders(self, replication_key, bookmark, cursor=None, fields=None):
+        """
+        With `orders_expansion` 'consignments', products and shipping
+        addresses are read from each order's consignments instead of
+        being requested per order.
+        """
+        for order in self.api.resource(self.resource_name('orders'), {
                 'min_date_modified': bookmark.isoformat(),
                 'sort': 'date_modified:asc'
-        }):
+        }, cursor=cursor, fields=fields):
             yield order
 
     @parse_date_string_arguments('bookmark')
     @validate
-    def products(self, replication_key, bookmark):
+    def products(self, replication_key, bookmark, cursor=None, fields=None):
 
         for product in self.api.resource('products', {
                 'date_modified:min': bookmark.isoformat(),
                 'sort': 'date_modified',
                 'direction': 'asc'
-        }):
+        }, cursor=cursor, fields=fields):
             yield product
 
+    def product_children(self, name, bookmark, cursor=None):
+        """
+        Rows of a product sub-resource for every product modified since
+        `bookmark`. The sub-resource is `include`d with the products, 250
+        products per page, instead of being requested per product. Each
+        row gets its product's `product_id` and `product_date_modified`,
+        which is the child stream's replication key.
+        """
+        include = PRODUCT_CHILDREN[name]
+
+        for product in self.api.resource('product_children', {
+                'date_modified:min': bookmark.isoformat(),
+                'sort': 'date_modified',
+                'direction': 'asc',
+                'include': include
+        }, cursor=cursor, fields=['id', 'date_modified'], stream=name):
+            for row in product.get(include) or []:
+                yield {
+                    **row,
+                    'product_id': product['id'],
+                    'product_date_modified': product['date_modified']
+                }
+
+    @parse_date_string_arguments('bookmark')
+    @validate
+    def product_variants(self, replication_key, bookmark, cursor=None,
+                         fields=None):
+        return self.product_children('product_variants', bookmark, cursor)
+
+    @parse_date_string_arguments('bookmark')
+    @validate
+    def product_images(self, replication_key, bookmark, cursor=None,
+                       fields=None):
+        return self.product_children('product_images', bookmark, cursor)
+
     @parse_date_string_arguments('bookmark')
     @validate
-    def customers(self, replication_key, bookmark):
+    def product_custom_fields(self, replication_key, bookmark, cursor=None,
+                              fields=None):
+        return self.product_children(
+            'product_custom_fields', bookmark, cursor)
+
+    @parse_date_string_arguments('bookmark')
+    @validate
+    def product_modifiers(self, replication_key, bookmark, cursor=None,
+                          fields=None):
+        return self.product_children('product_modifiers', bookmark, cursor)
+
+    @parse_date_string_arguments('bookmark')
+    @validate
+    def customers(self, replication_key, bookmark, cursor=None,
+                  fields=None):
         """
-        Customers endpoint can't sort by date_modified, so resource
-        is queried by day to ensure consistent replication key
+        v2 customers endpoint can't sort by date_modified, so resource
+        is queried by day to ensure consistent replication key.
+
+        If the cursor holds a window, iteration resumes from that
+        window (and the cursor's page within it).
+
+        With `customers_version` 3, the v3 endpoint is sorted by
+        date_modified instead and form fields are included inline.
         """
+        if self.customers_version == 3:
+            for customer in self.api.resource('customers_v3', {
+                    'date_modified:min': bookmark.isoformat(),
+                    'sort': 'date_modified:asc'
+            }, cursor=cursor, fields=fields):
+                yield map_customer_v3(customer)
+            return
+
+        cursor = cursor if cursor is not None else {}
+
+        if cursor.get('window'):
+            bookmark = parse(cursor['window'])
 
         for start, end in self.iterdates(bookmark):
+            cursor['window'] = start.isoformat()
             for customer in self.api.resource('customers', {
                     'min_date_modified': start.isoformat(),
                     'max_date_modified': end.isoformat()
-            }):
+            }, cursor=cursor, fields=fields):
                 yield customer
+            cursor['page'] = 1
+            cursor['skip'] = None
 
     def coupons(self):
 
@@ -0,0 +1,86 @@
+#!/usr/bin/env python
+"""
+Daemon mode.
+
+Instead of syncing once and exiting, the tap keeps its client (and the
+client's connection pool) and polls the selected streams every
+`poll_interval` seconds, writing records and STATE as it goes. Full
+table streams are only synced on the first poll.
+
+When a poll finds no new rows the interval is doubled, up to
+`max_poll_interval`; it drops back to `poll_interval` as soon as a poll
+finds rows. A poll that fails is logged and retried after backing off.
+SIGTERM and SIGINT stop the daemon once the current poll has finished.
+"""
+import signal
+import threading
+
+import singer
+
+
+logger = singer.get_logger().getChild('tap-bigcommerce')
+
+DEFAULT_POLL_INTERVAL = 60
+
+DEFAULT_MAX_POLL_INTERVAL = 900
+
+
+class Daemon():
+
+    def __init__(self, poll_interval=DEFAULT_POLL_INTERVAL,
+                 max_poll_interval=DEFAULT_MAX_POLL_INTERVAL, stop=None):
+        self.poll_interval = poll_interval
+        self.max_poll_interval = max(max_poll_interval, poll_interval)
+        self.stop = stop or threading.Event()
+
+    def next_interval(self, interval, rows):
+        if rows:
+            return self.poll_interval
+        return min(interval * 2, self.max_poll_interval)
+
+    def install_signal_handlers(self):
+        def handle(signum, frame):
+            logger.info("Received signal %s, stopping after this poll",
+                        signum)
+            self.stop.set()
+
+        signal.signal(signal.SIGTERM, handle)
+        signal.signal(signal.SIGINT, handle)
+
+    def run(self, poll):
+        """
+        Call `poll(first)` until stopped. `poll` returns the number of
+        rows synced.
+        """
+        first = True
+        interval = self.poll_interval
+        polls = 0
+        while not self.stop.is_set():
+            try:
+                rows = poll(first)
+                first = False
+            except Exception as e:
+                logger.error("Poll failed: %s", e)
+                rows = 0
+
+            polls += 1
+            interval = self.next_interval(interval, rows)
+            logger.info(
+                "Poll %s synced %s rows, next poll in %s seconds",
+                polls, rows, interval
+            )
+            self.stop.wait(interval)
+
+        logger.info("Daemon stopped after %s polls", polls)
+        return polls
+
+
+def daemon_from_config(config):
+    if not config.get('daemon'):
+        return None
+
+    return Daemon(
+        poll_interval=config.get('poll_interval', DEFAULT_POLL_INTERVAL),
+        max_poll_interval=config.get(
+            'max_poll_interval', DEFAULT_MAX_POLL_INTERVAL)
+    )
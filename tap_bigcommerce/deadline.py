@@ -0,0 +1,62 @@
+#!/usr/bin/env python
+"""
+Time-budgeted runs.
+
+When `max_runtime` (seconds) is set, the run stops before it would be
+killed by an orchestrator's time slot. Before each page is requested,
+and before waiting for the rate limit window to reset, the time left is
+compared with `runtime_margin` plus the time the last page took. Once
+too little time is left, no further page (and so no further nested
+resource request) is issued: the page being emitted has already been
+fetched in full, `DeadlineReached` ends the stream, its bookmark and
+checkpoint are written in a final STATE and the remaining streams are
+skipped. The next run resumes from that checkpoint.
+"""
+import time
+
+import singer
+
+
+logger = singer.get_logger().getChild('tap-bigcommerce')
+
+DEFAULT_MARGIN = 30
+
+
+class DeadlineReached(Exception):
+    pass
+
+
+class Deadline():
+
+    def __init__(self, max_runtime, margin=DEFAULT_MARGIN, clock=time.time):
+        self.max_runtime = max_runtime
+        self.margin = margin
+        self.clock = clock
+        self.started = clock()
+        self.expired = False
+
+    def remaining(self):
+        return self.max_runtime - (self.clock() - self.started)
+
+    def reached(self, estimate=0):
+        """
+        True if less than the margin plus `estimate` seconds are left.
+        Once reached, the deadline stays reached.
+        """
+        if not self.expired and self.remaining() < self.margin + estimate:
+            logger.info(
+                "max_runtime reached with %.1f seconds left, stopping",
+                self.remaining()
+            )
+            self.expired = True
+        return self.expired
+
+
+def deadline_from_config(config):
+    if not config.get('max_runtime'):
+        return None
+
+    return Deadline(
+        config['max_runtime'],
+        margin=config.get('runtime_margin', DEFAULT_MARGIN)
+    )
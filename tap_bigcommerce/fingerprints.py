@@ -0,0 +1,71 @@
+#!/usr/bin/env python
+"""
+Local store of record content fingerprints.
+
+Maps each stream's record keys to a short hash of the record content as
+returned by the API. Streams consult the store before yielding a record
+and skip records whose content has not changed since the store was last
+saved - which stops FULL_TABLE coupons and the inclusive boundary rows of
+incremental streams being re-emitted on every run.
+
+A record's fingerprint is only updated once the record has been written,
+and the store is only saved once a stream has completed, so a record
+that fails to transform or write, or a run that fails part way through,
+will re-emit rather than lose records.
+"""
+import os
+import json
+import hashlib
+
+import singer
+
+
+logger = singer.get_logger().getChild('tap-bigcommerce')
+
+
+def fingerprint(record):
+    content = json.dumps(record, sort_keys=True, default=str)
+    return hashlib.blake2b(
+        content.encode('utf-8'), digest_size=8
+    ).hexdigest()
+
+
+class FingerprintStore():
+
+    def __init__(self, path):
+        self.path = path
+        self.fingerprints = {}
+
+        if os.path.exists(self.path):
+            with open(self.path) as f:
+                self.fingerprints = json.load(f)
+
+    def has_changed(self, stream_name, key, record):
+        """
+        Returns True if the record is new or its content differs from
+        the stored fingerprint.
+        """
+        stream_fingerprints = self.fingerprints.get(stream_name, {})
+        return stream_fingerprints.get(key) != fingerprint(record)
+
+    def update(self, stream_name, key, record):
+        """
+        Store the fingerprint of a record that has been written.
+        """
+        stream_fingerprints = self.fingerprints.setdefault(stream_name, {})
+        stream_fingerprints[key] = fingerprint(record)
+
+    def save(self):
+        tmp_path = self.path + '.tmp'
+        with open(tmp_path, 'w') as f:
+            json.dump(self.fingerprints, f, separators=(',', ':'))
+            f.flush()
+            os.fsync(f.fileno())
+        os.replace(tmp_path, self.path)
+
+
+def fingerprint_store_from_config(config):
+    if not config.get('fingerprint_path'):
+        return None
+
+    return FingerprintStore(config['fingerprint_path'])
@@ -0,0 +1,191 @@
+#!/usr/bin/env python
+"""
+Hedged requests for nested resources.
+
+A page of orders can't be yielded until all of its nested resource
+requests have resolved, so one slow request stalls the whole page. When
+hedging is enabled, a nested resource request that has been running for
+longer than a percentile of recently observed latencies gets a duplicate
+request, and whichever response arrives first is used.
+
+Duplicates cost quota, so no more than `max_ratio` of requests are ever
+hedged, and the caller can veto a hedge (for instance when few requests
+are left in the rate limit window). Only idempotent GETs should be
+hedged.
+"""
+import time
+import heapq
+import threading
+from collections import deque
+from concurrent.futures import Future
+
+import singer
+
+
+logger = singer.get_logger().getChild('tap-bigcommerce')
+
+DEFAULT_PERCENTILE = 95
+
+DEFAULT_MAX_RATIO = 0.05
+
+DEFAULT_MIN_SAMPLES = 20
+
+
+class LatencyTracker():
+
+    def __init__(self, size=1000, min_samples=DEFAULT_MIN_SAMPLES):
+        self.samples = deque(maxlen=size)
+        self.min_samples = min_samples
+        self.lock = threading.Lock()
+
+    def record(self, seconds):
+        with self.lock:
+            self.samples.append(seconds)
+
+    def percentile(self, percentile):
+        """
+        Returns the latency at `percentile`, or None until enough
+        samples have been recorded.
+        """
+        with self.lock:
+            if len(self.samples) < self.min_samples:
+                return None
+            ordered = sorted(self.samples)
+        index = min(
+            int(len(ordered) * percentile / 100), len(ordered) - 1
+        )
+        return ordered[index]
+
+
+class HedgedRequest():
+
+    def __init__(self, executor, send, allow, hedge_executor=None):
+        self.executor = executor
+        self.hedge_executor = hedge_executor or executor
+        self.send = send
+        self.allow = allow
+        self.future = Future()
+        self.pending = 1
+        self.hedged = False
+        self.lock = threading.Lock()
+
+
+class Hedger():
+
+    def __init__(self, percentile=DEFAULT_PERCENTILE,
+                 max_ratio=DEFAULT_MAX_RATIO,
+                 min_samples=DEFAULT_MIN_SAMPLES):
+        self.percentile = percentile
+        self.max_ratio = max_ratio
+        self.latency = LatencyTracker(min_samples=min_samples)
+
+        self.requests = 0
+        self.hedges = 0
+        self.wins = 0
+
+        self.heap = []
+        self.sequence = 0
+        self.condition = threading.Condition()
+        self.thread = None
+
+    def submit(self, executor, send, allow=None, hedge_executor=None):
+        """
+        Submit `send` (a blocking function returning a response) to
+        `executor`, hedging it if it runs too long. Hedges are submitted
+        to `hedge_executor` if given.
+
+        Returns a Future resolved with the first successful response.
+        """
+        request = HedgedRequest(executor, send, allow, hedge_executor)
+        with self.condition:
+            self.requests += 1
+        self._attempt(request, hedge=False)
+        return request.future
+
+    def _attempt(self, request, hedge):
+        def run():
+            start = time.time()
+            if not hedge:
+                threshold = self.latency.percentile(self.percentile)
+                if threshold is not None:
+                    self._schedule(start + threshold, request)
+            response = request.send()
+            self.latency.record(time.time() - start)
+            return response
+
+        executor = request.hedge_executor if hedge else request.executor
+        future = executor.submit(run)
+        future.add_done_callback(
+            lambda f: self._done(request, f, hedge)
+        )
+
+    def _done(self, request, future, hedge):
+        with request.lock:
+            request.pending -= 1
+            if request.future.done():
+                return
+
+            exception = future.exception()
+            if exception is None:
+                request.future.set_result(future.result())
+                if hedge:
+                    with self.condition:
+                        self.wins += 1
+            elif request.pending == 0:
+                request.future.set_exception(exception)
+
+    def _schedule(self, deadline, request):
+        with self.condition:
+            if self.thread is None:
+                self.thread = threading.Thread(
+                    target=self._run, name='tap-bigcommerce-hedger',
+                    daemon=True
+                )
+                self.thread.start()
+            self.sequence += 1
+            heapq.heappush(self.heap, (deadline, self.sequence, request))
+            self.condition.notify()
+
+    def _can_hedge(self):
+        # called with the condition held
+        return self.hedges < self.max_ratio * self.requests
+
+    def _run(self):
+        while True:
+            with self.condition:
+                while not self.heap or self.heap[0][0] > time.time():
+                    timeout = self.heap[0][0] - time.time() \
+                        if self.heap else None
+                    self.condition.wait(timeout)
+                _, _, request = heapq.heappop(self.heap)
+
+                if request.future.done() or not self._can_hedge():
+                    continue
+                if request.allow is not None and not request.allow():
+                    continue
+                self.hedges += 1
+
+            with request.lock:
+                if request.future.done():
+                    continue
+                request.pending += 1
+                request.hedged = True
+            self._attempt(request, hedge=True)
+
+    def stats(self):
+        with self.condition:
+            return {
+                'requests': self.requests,
+                'hedges': self.hedges,
+                'wins': self.wins
+            }
+
+
+def hedger_from_config(config):
+    if not config.get('hedge_requests'):
+        return None
+
+    return Hedger(
+        percentile=config.get('hedge_percentile', DEFAULT_PERCENTILE),
+        max_ratio=config.get('hedge_max_ratio', DEFAULT_MAX_RATIO)
+    )
@@ -0,0 +1,118 @@
+#!/usr/bin/env python
+"""
+Conditional GET cache.
+
+Full table resources such as coupons are downloaded in full on every
+run although they rarely change. `HttpCache` keeps the body and the
+`ETag` / `Last-Modified` validators of each page in a local SQLite
+database, keyed by the full request URL. The next request for the page
+is sent with `If-None-Match` / `If-Modified-Since`, and a
+`304 Not Modified` response is served from the cached body.
+"""
+import sqlite3
+import threading
+
+import singer
+from requests import Request
+
+
+logger = singer.get_logger().getChild('tap-bigcommerce')
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS responses (
+    url TEXT PRIMARY KEY,
+    etag TEXT,
+    last_modified TEXT,
+    body TEXT NOT NULL
+)
+"""
+
+
+def request_url(url, params):
+    return Request('GET', url, params=params).prepare().url
+
+
+class HttpCache():
+
+    def __init__(self, path):
+        self.path = path
+        self.lock = threading.Lock()
+        self.connection = sqlite3.connect(path, check_same_thread=False)
+        self.connection.execute(SCHEMA)
+        self.connection.commit()
+        # URLs requested conditionally whose responses may be cached
+        self.tracked = set()
+        self.hits = 0
+        self.misses = 0
+
+    def validators(self, url, params):
+        """
+        Returns the conditional request headers for a request and marks
+        its response as cacheable.
+        """
+        key = request_url(url, params)
+        with self.lock:
+            self.tracked.add(key)
+            row = self.connection.execute(
+                'SELECT etag, last_modified FROM responses WHERE url = ?',
+                (key,)
+            ).fetchone()
+
+        headers = {}
+        if row is not None:
+            etag, last_modified = row
+            if etag:
+                headers['If-None-Match'] = etag
+            if last_modified:
+                headers['If-Modified-Since'] = last_modified
+        return headers
+
+    def tracks(self, key):
+        with self.lock:
+            return key in self.tracked
+
+    def body(self, key):
+        """
+        Cached body for a `304 Not Modified` response.
+        """
+        with self.lock:
+            row = self.connection.execute(
+                'SELECT body FROM responses WHERE url = ?', (key,)
+            ).fetchone()
+            if row is None:
+                self.misses += 1
+                return None
+            self.hits += 1
+            return row[0]
+
+    def store(self, key, resp):
+        """
+        Cache a `200` response if it carries a validator.
+        """
+        etag = resp.headers.get('ETag')
+        last_modified = resp.headers.get('Last-Modified')
+        if not etag and not last_modified:
+            return
+
+        with self.lock:
+            self.misses += 1
+            self.connection.execute(
+                'INSERT OR REPLACE INTO responses VALUES (?, ?, ?, ?)',
+                (key, etag, last_modified, resp.text)
+            )
+            self.connection.commit()
+
+    def close(self):
+        with self.lock:
+            self.connection.close()
+        logger.info(
+            "HTTP cache: %s not modified, %s downloaded",
+            self.hits, self.misses
+        )
+
+
+def http_cache_from_config(config):
+    if not config.get('http_cache_path'):
+        return None
+
+    return HttpCache(config['http_cache_path'])
@@ -0,0 +1,125 @@
+#!/usr/bin/env python
+"""
+Memory ceiling for syncs.
+
+`Bigcommerce.resource` holds a full page of rows and every nested
+resource response for it in memory at once. `MemoryGuard` samples the
+process's memory use before each page and, once it passes `threshold`
+of `limit`, scales down both the page size and the number of rows whose
+nested resources are requested at once. The scale recovers as memory
+is freed.
+
+Memory is read from RSS (`/proc/self/statm`) by default, or from
+`tracemalloc` when `source` is 'tracemalloc'. The highest usage seen
+while syncing each stream is logged as a `memory_high_water` metric.
+"""
+import os
+import resource
+import sys
+import tracemalloc
+
+import singer
+
+from tap_bigcommerce.planner import log_gauge
+
+
+logger = singer.get_logger().getChild('tap-bigcommerce')
+
+DEFAULT_THRESHOLD = 0.8
+
+# never scale below this fraction of the normal page size
+MIN_SCALE = 0.1
+
+
+def rss_bytes():
+    """
+    Current resident set size. Falls back to peak RSS where /proc is
+    not available.
+    """
+    try:
+        with open('/proc/self/statm') as f:
+            return int(f.read().split()[1]) * os.sysconf('SC_PAGE_SIZE')
+    except (OSError, ValueError, IndexError):
+        peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+        # kilobytes on Linux, bytes on macOS
+        return peak if sys.platform == 'darwin' else peak * 1024
+
+
+def traced_bytes():
+    return tracemalloc.get_traced_memory()[0]
+
+
+class MemoryGuard():
+
+    def __init__(self, limit, threshold=DEFAULT_THRESHOLD, source='rss'):
+        """
+        `limit` is in bytes.
+        """
+        self.limit = limit
+        self.threshold = threshold
+        if source == 'tracemalloc':
+            if not tracemalloc.is_tracing():
+                tracemalloc.start()
+            self.usage = traced_bytes
+        else:
+            self.usage = rss_bytes
+
+        self.stream = None
+        self.high_water = {}
+        self.last_scale = 1.0
+
+    def scale(self):
+        """
+        Sample memory use and return the fraction (between `MIN_SCALE`
+        and 1) of the normal page size and in-flight requests to use.
+        """
+        used = self.usage()
+        if self.stream is not None:
+            self.high_water[self.stream] = max(
+                self.high_water.get(self.stream, 0), used
+            )
+
+        soft_limit = self.limit * self.threshold
+        if used <= soft_limit:
+            scale = 1.0
+        else:
+            scale = max(
+                MIN_SCALE,
+                (self.limit - used) / (self.limit - soft_limit)
+            )
+
+        if scale < 1.0 and scale != self.last_scale:
+            logger.warning(
+                "Memory use %.0f MB is near the %.0f MB limit, "
+                "scaling requests to %.0f%%",
+                used / 1e6, self.limit / 1e6, scale * 100
+            )
+        self.last_scale = scale
+        return scale
+
+    def start(self, stream):
+        self.stream = stream
+        self.scale()
+
+    def finish(self):
+        """
+        Log the high-water mark for the current stream.
+        """
+        if self.stream is None:
+            return
+        log_gauge('memory_high_water', self.high_water.get(self.stream, 0), {
+            'endpoint': self.stream,
+            'limit': self.limit
+        })
+        self.stream = None
+
+
+def memory_guard_from_config(config):
+    if not config.get('memory_limit_mb'):
+        return None
+
+    return MemoryGuard(
+        int(config['memory_limit_mb'] * 1024 * 1024),
+        threshold=config.get('memory_threshold', DEFAULT_THRESHOLD),
+        source=config.get('memory_source', 'rss')
+    )
@@ -0,0 +1,158 @@
+#!/usr/bin/env python
+"""
+On-disk cache of nested resources.
+
+Every order costs one request per nested resource (products, coupons,
+shipping addresses), and the same unchanged orders are requested again
+whenever a window is re-synced. `NestedResourceCache` keeps the resolved
+nested resources of each row in a local SQLite database, keyed by the
+row's id and `date_modified`. A row whose `date_modified` hasn't changed
+is served from the cache without any nested requests.
+
+The cache is bounded by the total size of the cached JSON; the least
+recently used rows are evicted first.
+"""
+import json
+import sqlite3
+import threading
+
+import singer
+
+
+logger = singer.get_logger().getChild('tap-bigcommerce')
+
+DEFAULT_MAX_MB = 256
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS nested_resources (
+    resource TEXT NOT NULL,
+    id INTEGER NOT NULL,
+    date_modified TEXT NOT NULL,
+    data TEXT NOT NULL,
+    size INTEGER NOT NULL,
+    accessed INTEGER NOT NULL,
+    PRIMARY KEY (resource, id)
+)
+"""
+
+
+class NestedResourceCache():
+
+    def __init__(self, path, max_bytes=DEFAULT_MAX_MB * 1024 * 1024):
+        self.path = path
+        self.max_bytes = max_bytes
+        self.lock = threading.Lock()
+        self.connection = sqlite3.connect(path, check_same_thread=False)
+        self.connection.execute(SCHEMA)
+        self.connection.execute(
+            'CREATE INDEX IF NOT EXISTS nested_resources_accessed '
+            'ON nested_resources (accessed)'
+        )
+        self.connection.commit()
+
+        row = self.connection.execute(
+            'SELECT COALESCE(MAX(accessed), 0), COALESCE(SUM(size), 0) '
+            'FROM nested_resources'
+        ).fetchone()
+        self.clock, self.size = row
+
+        self.hits = 0
+        self.misses = 0
+
+    def _tick(self):
+        self.clock += 1
+        return self.clock
+
+    def get(self, resource, row):
+        """
+        Returns the cached nested resources for `row` as a dict of
+        field to data, or None if the row has changed or isn't cached.
+        """
+        if row.get('id') is None or row.get('date_modified') is None:
+            return None
+
+        with self.lock:
+            found = self.connection.execute(
+                'SELECT data FROM nested_resources '
+                'WHERE resource = ? AND id = ? AND date_modified = ?',
+                (resource, row['id'], row['date_modified'])
+            ).fetchone()
+            if found is None:
+                self.misses += 1
+                return None
+
+            self.hits += 1
+            self.connection.execute(
+                'UPDATE nested_resources SET accessed = ? '
+                'WHERE resource = ? AND id = ?',
+                (self._tick(), resource, row['id'])
+            )
+            return json.loads(found[0])
+
+    def put(self, resource, row, nested):
+        """
+        Cache `nested` (a dict of field to data) for `row`.
+        """
+        if row.get('id') is None or row.get('date_modified') is None:
+            return
+
+        data = json.dumps(nested, separators=(',', ':'))
+        with self.lock:
+            previous = self.connection.execute(
+                'SELECT size FROM nested_resources '
+                'WHERE resource = ? AND id = ?',
+                (resource, row['id'])
+            ).fetchone()
+            if previous is not None:
+                self.size -= previous[0]
+
+            self.connection.execute(
+                'INSERT OR REPLACE INTO nested_resources '
+                'VALUES (?, ?, ?, ?, ?, ?)',
+                (resource, row['id'], row['date_modified'], data,
+                 len(data), self._tick())
+            )
+            self.size += len(data)
+
+    def commit(self):
+        """
+        Evict least recently used rows until the cache fits and commit.
+        """
+        with self.lock:
+            while self.size > self.max_bytes:
+                evicted = self.connection.execute(
+                    'SELECT resource, id, size FROM nested_resources '
+                    'ORDER BY accessed LIMIT 100'
+                ).fetchall()
+                if not evicted:
+                    break
+                for resource, id, size in evicted:
+                    if self.size <= self.max_bytes:
+                        break
+                    self.connection.execute(
+                        'DELETE FROM nested_resources '
+                        'WHERE resource = ? AND id = ?',
+                        (resource, id)
+                    )
+                    self.size -= size
+            self.connection.commit()
+
+    def close(self):
+        self.commit()
+        self.connection.close()
+        logger.info(
+            "Nested resource cache: %s hits, %s misses",
+            self.hits, self.misses
+        )
+
+
+def nested_cache_from_config(config):
+    if not config.get('nested_cache_path'):
+        return None
+
+    return NestedResourceCache(
+        config['nested_cache_path'],
+        max_bytes=int(
+            config.get('nested_cache_max_mb', DEFAULT_MAX_MB) * 1024 * 1024
+        )
+    )
@@ -0,0 +1,104 @@
+#!/usr/bin/env python
+"""
+Singer message output.
+
+`Output` writes messages for a single store exactly as the singer
+library does. `StoreOutput` is used in multi-store mode: stream names are
+prefixed with the store hash, writes from concurrent store syncs are
+serialized with a lock, and STATE is written as a single object holding
+every store's state under `stores`.
+"""
+import sys
+import copy
+import threading
+
+import singer
+
+from tap_bigcommerce.batch import BatchMessage
+from tap_bigcommerce.parallel import record_message
+
+
+class Output():
+
+    def stream_name(self, stream_name):
+        return stream_name
+
+    def write_message(self, message):
+        singer.write_message(message)
+
+    def write_lines(self, lines):
+        for line in lines:
+            sys.stdout.write(line)
+            sys.stdout.write('\n')
+        sys.stdout.flush()
+
+    def write_schema(self, stream_name, schema, key_properties):
+        self.write_message(singer.SchemaMessage(
+            stream=self.stream_name(stream_name),
+            schema=schema,
+            key_properties=key_properties
+        ))
+
+    def write_record(self, stream_name, record):
+        self.write_message(singer.RecordMessage(
+            stream=self.stream_name(stream_name),
+            record=record
+        ))
+
+    def write_record_json(self, stream_name, records_json):
+        """
+        Write RECORD messages around records already serialized to JSON.
+        """
+        name = self.stream_name(stream_name)
+        self.write_lines(
+            record_message(name, record_json) for record_json in records_json
+        )
+
+    def write_batch(self, stream_name, manifest):
+        self.write_message(
+            BatchMessage(self.stream_name(stream_name), manifest)
+        )
+
+    def write_state(self, state):
+        self.write_message(singer.StateMessage(value=state))
+
+
+class MultiStoreState():
+    """
+    Combined state for every store, written as {"stores": {...}}.
+    """
+
+    def __init__(self, states=None):
+        self.states = states or {}
+        self.lock = threading.Lock()
+
+    def get(self, store_hash):
+        return copy.deepcopy(self.states.get(store_hash, {}))
+
+    def update(self, store_hash, state):
+        self.states[store_hash] = copy.deepcopy(state)
+        return {'stores': self.states}
+
+
+class StoreOutput(Output):
+
+    def __init__(self, store_hash, multi_state):
+        self.store_hash = store_hash
+        self.multi_state = multi_state
+
+    def stream_name(self, stream_name):
+        return '{}_{}'.format(self.store_hash, stream_name)
+
+    def write_message(self, message):
+        with self.multi_state.lock:
+            singer.write_message(message)
+
+    def write_lines(self, lines):
+        lines = list(lines)
+        with self.multi_state.lock:
+            super().write_lines(lines)
+
+    def write_state(self, state):
+        with self.multi_state.lock:
+            value = self.multi_state.update(self.store_hash, state)
+            singer.write_message(singer.StateMessage(value=value))
@@ -0,0 +1,109 @@
+#!/usr/bin/env python
+"""
+Process pool offload of CPU bound record transformation.
+
+Filtering excluded paths, transforming dates, the Singer Transformer and
+JSON serialization all run under the GIL, which caps throughput at one
+core on stores with a generous API quota. When `transform_workers` is
+configured, rows are buffered, split into chunks and handed to a process
+pool, which runs all of these steps in one trip. `Executor.map` returns
+chunk results in submission order, so the records are written in the
+same order they were fetched.
+
+Sub-resource Futures can't cross a process boundary, so rows are always
+resolved on the main process before being handed to the pool.
+"""
+import os
+from concurrent.futures import ProcessPoolExecutor
+
+import simplejson as json
+import singer
+from singer import Transformer
+
+from tap_bigcommerce.bigcommerce import filter_excluded_paths
+from tap_bigcommerce.bigcommerce import transform_dates
+
+
+logger = singer.get_logger().getChild('tap-bigcommerce')
+
+DEFAULT_CHUNK_SIZE = 250
+
+
+def serialize_records(rows, schema, mdata, exclude_paths=[],
+                      date_fields=[]):
+    """
+    Filter excluded paths, transform dates, run the Singer Transformer
+    over each record and serialize it to a JSON string. Returns a list
+    of (record_json, error) tuples, with record_json None if the record
+    failed to transform.
+    """
+    results = []
+    with Transformer() as transformer:
+        for row in rows:
+            try:
+                row = transform_dates(
+                    filter_excluded_paths(row, exclude_paths), date_fields)
+                record = transformer.transform(row, schema, mdata)
+                results.append((json.dumps(record, use_decimal=True), None))
+            except Exception as e:
+                results.append((None, str(e)))
+    return results
+
+
+def record_message(stream_name, record_json):
+    """
+    Build a RECORD message line around an already serialized record.
+    """
+    return '{{"type": "RECORD", "stream": {}, "record": {}}}'.format(
+        json.dumps(stream_name), record_json
+    )
+
+
+class TransformPool():
+    """
+    Ordered chunked map over a ProcessPoolExecutor, used by
+    `sync_stream` for `serialize_records`.
+    """
+
+    def __init__(self, workers=None, chunk_size=DEFAULT_CHUNK_SIZE):
+        self.workers = workers or os.cpu_count()
+        self.chunk_size = int(chunk_size)
+        self.executor = ProcessPoolExecutor(max_workers=self.workers)
+
+    def chunks(self, rows):
+        # split evenly across workers, but no larger than chunk_size
+        size = max(1, min(
+            self.chunk_size,
+            -(-len(rows) // self.workers)
+        ))
+        return [rows[i:i + size] for i in range(0, len(rows), size)]
+
+    def map(self, fn, rows, *args):
+        """
+        Apply `fn(chunk, *args)` to chunks of `rows` in the pool and
+        return the flattened results in the original order.
+        """
+        if not rows:
+            return []
+
+        chunks = self.chunks(rows)
+        results = self.executor.map(
+            fn, chunks, *[[arg] * len(chunks) for arg in args]
+        )
+        return [item for chunk in results for item in chunk]
+
+    def shutdown(self):
+        self.executor.shutdown()
+
+
+def transform_pool_from_config(config):
+    if not config.get('transform_workers'):
+        return None
+
+    workers = config['transform_workers']
+    logger.info("Transforming records with %s worker processes", workers)
+
+    return TransformPool(
+        workers=None if workers == 'auto' else int(workers),
+        chunk_size=config.get('transform_chunk_size', DEFAULT_CHUNK_SIZE)
+    )
@@ -0,0 +1,116 @@
+#!/usr/bin/env python
+"""
+Raw passthrough of records that already match their schema.
+
+The Singer `Transformer` copies every record while coercing each value
+to its schema type, dropping unknown and deselected fields and
+re-formatting date-times. For most v3 rows (products with an
+`include_fields` projection, the product child streams) none of that
+changes anything. `compile_validator` builds a check from a stream's
+schema and metadata, once per stream, that walks a record without
+copying it and returns True if the record can be written as is:
+
+    * every value already has one of its schema types, exactly as the
+      Transformer would write it (`number` values are floats, `bool` is
+      never an integer)
+    * no object has a key its schema doesn't define, and no top level
+      field is deselected
+    * date-times are in the Transformer's format
+      (`2019-01-01T00:00:00.000000Z`)
+
+Records that fail the check go through the `Transformer` as before, so
+the records written are the same either way. Enabled with
+`raw_passthrough`.
+"""
+import re
+
+
+DATETIME_RE = re.compile(
+    r'^\d{4}-\d{2}-\d{2}T\d{2}:\d{2}:\d{2}\.\d{6}Z$'
+)
+
+
+def _never(value):
+    return False
+
+
+def _type_check(typ, schema):
+    if typ == 'null':
+        return lambda value: value is None
+    if typ == 'string':
+        if schema.get('format') == 'date-time':
+            return lambda value: type(value) == str and \
+                DATETIME_RE.match(value) is not None
+        return lambda value: type(value) == str
+    if typ == 'integer':
+        return lambda value: type(value) == int
+    if typ == 'number':
+        return lambda value: type(value) == float
+    if typ == 'boolean':
+        return lambda value: type(value) == bool
+    if typ == 'object':
+        return _object_check(schema.get('properties', {}))
+    if typ == 'array':
+        item_check = _compile(schema.get('items', {}))
+        return lambda value: type(value) == list and \
+            all(item_check(item) for item in value)
+    return _never
+
+
+def _object_check(properties, excluded=()):
+    checks = {
+        key: _compile(sub_schema) for key, sub_schema in properties.items()
+        if key not in excluded
+    }
+
+    def check(value):
+        if type(value) != dict:
+            return False
+        for key, item in value.items():
+            item_check = checks.get(key)
+            if item_check is None or not item_check(item):
+                return False
+        return True
+
+    return check
+
+
+def _compile(schema):
+    # constructs the Transformer handles specially aren't passed through
+    if 'anyOf' in schema or 'patternProperties' in schema:
+        return _never
+    if 'type' not in schema:
+        return lambda value: True
+
+    types = schema['type']
+    if type(types) != list:
+        types = [types]
+    checks = [_type_check(typ, schema) for typ in types]
+
+    return lambda value: any(check(value) for check in checks)
+
+
+def compile_validator(schema, selected=None):
+    """
+    Returns a function that is True for records the Transformer would
+    leave unchanged, or None if the schema isn't a plain object schema.
+    `selected` is the list of top level fields kept by the catalog (see
+    `Stream.selected_fields`), or None if every field is kept.
+    """
+    if 'object' not in schema.get('type', []) or \
+            'patternProperties' in schema:
+        return None
+
+    properties = schema.get('properties', {})
+    excluded = ()
+    if selected is not None:
+        excluded = [key for key in properties if key not in selected]
+
+    return _object_check(properties, excluded)
+
+
+def passthrough_from_config(config, schema, selected=None):
+    if not config.get('raw_passthrough', False):
+        return None
+
+    return compile_validator(schema, selected)
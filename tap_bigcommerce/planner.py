@@ -0,0 +1,137 @@
+#!/usr/bin/env python
+"""
+Sync planning and progress reporting.
+
+Before a sync, each selected stream's remaining rows are counted (v2
+`/count` endpoints, v3 pagination totals) from its bookmark. Combined
+with the page size, the number of sub-resources per row and the store's
+rate limit quota this gives an estimate of the requests and wall time
+the sync will need. Estimates are logged as metrics, and during the sync
+progress and ETA metrics are logged against them.
+
+Wall time is estimated as the larger of the time the quota allows for
+the requests and the time the pages take when fetched one after another
+(with sub-resources fetched concurrently) at the latency observed for
+the count request.
+"""
+import math
+import time
+
+import singer
+from singer import metrics
+from singer.metrics import Point
+
+
+logger = singer.get_logger().getChild('tap-bigcommerce')
+
+DEFAULT_LOG_INTERVAL = 60
+
+
+def log_gauge(metric, value, tags):
+    metrics.log(logger, Point('gauge', metric, value, tags))
+
+
+def plan_stream(client, name, bookmark=None):
+    """
+    Estimate rows, requests and seconds needed to sync a stream from
+    `bookmark` onwards.
+    """
+    api = client.api
+    resource = client.resource_name(name)
+    endpoint = api.endpoints.get(resource, {})
+    sub_resources = endpoint.get('sub_resources', 0)
+    page_size = api.page_size(resource)
+
+    rows, latency = client.count(name, bookmark)
+
+    # a final short (or empty) page is always requested
+    pages = rows // page_size + 1
+    if resource == 'customers' and bookmark is not None:
+        # customers are requested in day windows
+        pages += len(list(client.iterdates(
+            singer.utils.strptime_to_utc(bookmark)))) - 1
+
+    requests = pages + rows * sub_resources
+
+    rate_limit = api.rate_limit
+    quota_seconds = 0
+    if rate_limit.get('requests_quota') and rate_limit.get('window_size_ms'):
+        quota_seconds = (
+            requests / rate_limit['requests_quota']
+        ) * (rate_limit['window_size_ms'] / 1000)
+
+    page_seconds = pages * latency * (2 if sub_resources else 1)
+
+    return {
+        'stream': name,
+        'rows': rows,
+        'pages': pages,
+        'page_size': page_size,
+        'requests': requests,
+        'seconds': math.ceil(max(quota_seconds, page_seconds))
+    }
+
+
+def plan_sync(client, stream_bookmarks):
+    """
+    Plan every stream in `stream_bookmarks` (a list of (name, bookmark)
+    tuples) and log the estimates.
+    """
+    plans = {}
+    for name, bookmark in stream_bookmarks:
+        plan = plans[name] = plan_stream(client, name, bookmark)
+        tags = {'endpoint': name, 'rows': plan['rows'],
+                'pages': plan['pages']}
+        log_gauge('estimated_requests', plan['requests'], tags)
+        log_gauge('estimated_seconds', plan['seconds'], tags)
+
+    total = {
+        'requests': sum(p['requests'] for p in plans.values()),
+        'seconds': sum(p['seconds'] for p in plans.values())
+    }
+    logger.info(
+        "Sync plan: %s requests, estimated %s seconds",
+        total['requests'], total['seconds']
+    )
+
+    return {'streams': plans, 'total': total}
+
+
+class Progress():
+    """
+    Periodically logs a `sync_progress` metric for a stream, with the
+    fraction of estimated rows synced and an ETA in seconds.
+    """
+
+    def __init__(self, name, plan, log_interval=DEFAULT_LOG_INTERVAL):
+        self.name = name
+        self.estimated_rows = plan['rows']
+        self.log_interval = log_interval
+        self.start = time.time()
+        self.last_log = self.start
+        self.rows = 0
+
+    def update(self, rows):
+        self.rows = rows
+        now = time.time()
+        if now - self.last_log >= self.log_interval:
+            self.log(now)
+
+    def eta(self, now):
+        if self.rows == 0:
+            return None
+        rate = self.rows / max(now - self.start, 1e-6)
+        return max(self.estimated_rows - self.rows, 0) / rate
+
+    def log(self, now=None):
+        now = now or time.time()
+        self.last_log = now
+        fraction = min(self.rows / self.estimated_rows, 1.0) \
+            if self.estimated_rows else 1.0
+        eta = self.eta(now)
+        log_gauge('sync_progress', round(fraction, 4), {
+            'endpoint': self.name,
+            'rows': self.rows,
+            'estimated_rows': self.estimated_rows,
+            'eta_seconds': None if eta is None else math.ceil(eta)
+        })
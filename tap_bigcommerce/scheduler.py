@@ -0,0 +1,128 @@
+#!/usr/bin/env python
+"""
+Priority-aware request scheduling.
+
+By default requests run in submission order, so a page's nested
+resource requests are all dispatched before the next page request, and
+in multi-store mode every stream competes equally for request threads.
+`PriorityScheduler` runs requests on its own pool of threads and
+dispatches them by class first:
+
+    PRIMARY     page, count and by-id requests, which the sync waits on
+    NESTED      nested resource requests of a page
+    BACKGROUND  speculative work such as hedged duplicates
+
+Within a class, requests are queued per key (a store and stream) and
+keys are served in proportion to their weight (stride scheduling), so
+a stream with weight 3 gets three requests dispatched for each one of a
+stream with weight 1 while both have work queued. Weights are set per
+stream with `stream_weights`.
+
+Quota is still reserved per page before the page is requested (see
+`Bigcommerce.resource`), so the scheduler decides the order in which
+reserved requests are spent.
+"""
+from collections import deque
+from concurrent.futures import Executor
+
+import singer
+
+from tap_bigcommerce.workers import WorkerPool
+
+
+logger = singer.get_logger().getChild('tap-bigcommerce')
+
+PRIMARY = 0
+
+NESTED = 1
+
+BACKGROUND = 2
+
+PRIORITIES = [PRIMARY, NESTED, BACKGROUND]
+
+DEFAULT_MAX_WORKERS = 8
+
+
+class ScheduledLane(Executor):
+    """
+    An Executor submitting to one priority class and key of a
+    `PriorityScheduler`.
+    """
+
+    def __init__(self, scheduler, priority, key):
+        self.scheduler = scheduler
+        self.priority = priority
+        self.key = key
+
+    def submit(self, fn, *args, **kwargs):
+        return self.scheduler.submit(
+            self.priority, self.key, fn, *args, **kwargs)
+
+    def shutdown(self, wait=True):
+        # the scheduler is shut down by its owner
+        pass
+
+
+class PriorityScheduler(WorkerPool):
+
+    thread_name = 'tap-bigcommerce-scheduler-{}'
+
+    def __init__(self, max_workers=DEFAULT_MAX_WORKERS, weights=None):
+        """
+        `weights` maps stream names to weights (default 1). Keys are
+        (store, stream) tuples, or stream names.
+        """
+        self.weights = weights or {}
+        self.queues = {priority: {} for priority in PRIORITIES}
+        self.passes = {}
+        self.virtual_time = {priority: 0.0 for priority in PRIORITIES}
+        super().__init__(max_workers)
+
+    def weight(self, key):
+        stream = key[-1] if type(key) == tuple else key
+        return max(float(self.weights.get(stream, 1)), 1e-6)
+
+    def lane(self, priority, key=None):
+        return ScheduledLane(self, priority, key)
+
+    def submit(self, priority, key, fn, *args, **kwargs):
+        def enqueue(item):
+            queue = self.queues[priority].setdefault(key, deque())
+            if not queue:
+                # a key that was idle doesn't get credit for the time
+                # it had nothing queued
+                self.passes[(priority, key)] = max(
+                    self.passes.get((priority, key), 0.0),
+                    self.virtual_time[priority]
+                )
+            queue.append(item)
+
+        return self._submit(enqueue, fn, args, kwargs)
+
+    def _next_item(self):
+        """
+        Pop the next item from the highest priority class with work
+        queued, from the key with the lowest pass. Must be called with
+        the condition held.
+        """
+        for priority in PRIORITIES:
+            queues = self.queues[priority]
+            keys = [key for key, queue in queues.items() if queue]
+            if not keys:
+                continue
+
+            key = min(keys, key=lambda k: self.passes[(priority, k)])
+            self.virtual_time[priority] = self.passes[(priority, key)]
+            self.passes[(priority, key)] += 1 / self.weight(key)
+            return queues[key].popleft()
+        return None
+
+
+def scheduler_from_config(config):
+    if not config.get('request_scheduler'):
+        return None
+
+    return PriorityScheduler(
+        max_workers=config.get('scheduler_workers', DEFAULT_MAX_WORKERS),
+        weights=config.get('stream_weights')
+    )
@@ -0,0 +1,257 @@
+#!/usr/bin/env python
+"""
+Deterministic simulation of rate limiting and request scheduling.
+
+Runs the real `Bigcommerce.resource` pacing code against a synthetic
+store on a virtual clock, so pacing strategies can be compared and
+regression-tested without network access or real sleeps.
+
+`SimulatedStore` models BigCommerce's fixed quota window: requests made
+after the quota is used up get a 429 until the window resets, and every
+response carries `X-Rate-Limit-*` headers. Page requests advance the
+clock by the request latency; nested resource requests are requested
+concurrently by the tap, so each advances the clock by the latency
+divided by the request concurrency.
+
+    $ python -m tap_bigcommerce.simulator --rows 2000
+
+prints throughput, 429s and idle time for each quota tier.
+"""
+import argparse
+from datetime import timedelta
+from concurrent.futures import Future
+
+from tap_bigcommerce.bigcommerce import Bigcommerce
+
+
+# requests per 30 second window
+QUOTA_TIERS = {
+    'standard': 150,
+    'pro': 450,
+    'enterprise': 7000000
+}
+
+DEFAULT_WINDOW_MS = 30000
+
+DEFAULT_LATENCY = 0.3
+
+DEFAULT_CONCURRENCY = 8
+
+
+class VirtualClock():
+
+    def __init__(self):
+        self.now = 0.0
+        self.idle = 0.0
+
+    def advance(self, seconds):
+        self.now += seconds
+
+    def sleep(self, seconds):
+        self.now += seconds
+        self.idle += seconds
+
+
+class SimulatedResponse():
+
+    def __init__(self, status_code, payload, headers, elapsed):
+        self.status_code = status_code
+        self.payload = payload
+        self.headers = headers
+        self.elapsed = timedelta(seconds=elapsed)
+
+    def json(self):
+        return self.payload
+
+
+class SimulatedStore():
+    """
+    A store with `rows` rows for each resource, each with
+    `sub_resources` nested resource stubs of `nested_items` items.
+    """
+
+    def __init__(self, quota, rows=1000, sub_resources=3, nested_items=1,
+                 window_ms=DEFAULT_WINDOW_MS, latency=DEFAULT_LATENCY,
+                 concurrency=DEFAULT_CONCURRENCY, clock=None):
+        self.quota = quota
+        self.rows = rows
+        self.sub_resources = sub_resources
+        self.nested_items = nested_items
+        self.window_ms = window_ms
+        self.latency = latency
+        self.concurrency = concurrency
+        self.clock = clock or VirtualClock()
+
+        self.window_end = None
+        self.used = 0
+        self.requests = 0
+        self.rate_limited = 0
+
+    def headers(self):
+        return {
+            'X-Rate-Limit-Time-Reset-Ms': str(max(int(
+                (self.window_end - self.clock.now) * 1000), 0)),
+            'X-Rate-Limit-Time-Window-Ms': str(self.window_ms),
+            'X-Rate-Limit-Requests-Left': str(max(self.quota - self.used, 0)),
+            'X-Rate-Limit-Requests-Quota': str(self.quota)
+        }
+
+    def row(self, url, i):
+        row = {'id': i + 1, 'date_modified': '2019-01-01T00:00:00Z'}
+        for n in range(self.sub_resources):
+            row['nested_{}'.format(n)] = {
+                'resource': '/nested',
+                'url': '{}/{}/nested_{}'.format(url, i + 1, n)
+            }
+        return row
+
+    def page(self, url, params, make_row=None, rows=None):
+        make_row = make_row or self.row
+        rows = self.rows if rows is None else rows
+        page, limit = params.get('page', 1), params.get('limit', 50)
+        start = (page - 1) * limit
+        return [
+            make_row(url, i)
+            for i in range(start, min(start + limit, rows))
+        ]
+
+    def request(self, url, params, nested=False):
+        self.requests += 1
+        self.clock.advance(
+            self.latency / self.concurrency if nested else self.latency
+        )
+
+        if self.window_end is None or self.clock.now >= self.window_end:
+            self.window_end = self.clock.now + self.window_ms / 1000
+            self.used = 0
+
+        if self.used >= self.quota:
+            self.rate_limited += 1
+            return SimulatedResponse(429, None, self.headers(), self.latency)
+
+        self.used += 1
+
+        base, last = url.rsplit('/', 1)
+        if url.endswith('/time'):
+            payload = {'time': int(self.clock.now)}
+        elif last.isdigit():
+            if int(last) > self.rows:
+                return SimulatedResponse(404, None, self.headers(),
+                                         self.latency)
+            payload = self.row(base, int(last) - 1)
+        elif 'id:in' in params:
+            payload = {'data': [
+                self.row(url, int(id) - 1)
+                for id in params['id:in'].split(',')
+                if int(id) <= self.rows
+            ]}
+        elif nested:
+            payload = self.page(
+                url, params, lambda url, i: {'id': i + 1}, self.nested_items)
+            if not payload:
+                return SimulatedResponse(204, None, self.headers(),
+                                         self.latency)
+        else:
+            payload = self.page(url, params)
+            if '/v3/' in url:
+                payload = {'data': payload}
+            elif not payload:
+                return SimulatedResponse(204, None, self.headers(),
+                                         self.latency)
+
+        return SimulatedResponse(200, payload, self.headers(), self.latency)
+
+
+class SimulatedBigcommerce(Bigcommerce):
+    """
+    `Bigcommerce` with the transport replaced by a `SimulatedStore`
+    and sleeps sent to the store's virtual clock.
+    """
+
+    def __init__(self, store):
+        self.store = store
+        super().__init__(
+            client_id='simulated',
+            access_token='simulated',
+            store_hash='simulated'
+        )
+
+    def _reset_session(self):
+        self.request_count = 0
+        self.headers = {}
+        self.get(self.make_url(2, 'time'), resolve=True)
+
+    def sleep(self, seconds):
+        self.store.clock.sleep(seconds)
+
+    def get(self, url, params={}, resolve=False, hedge=False,
+            conditional=False, priority=None):
+        nested = '/nested_' in url
+        response = self.store.request(url, params, nested=nested)
+
+        future = Future()
+        try:
+            self._response_hook(response)
+            future.set_result(response)
+        except Exception as e:
+            future.set_exception(e)
+
+        if resolve:
+            return future.result()
+        return future
+
+
+def simulate(quota, rows=1000, resource='orders', api_class=None,
+             **store_kwargs):
+    """
+    Sync `rows` rows of `resource` from a simulated store and return
+    a report of the simulated run.
+    """
+    store = SimulatedStore(
+        quota,
+        rows=rows,
+        sub_resources=Bigcommerce.endpoints.get(resource, {}).get(
+            'sub_resources', 0),
+        **store_kwargs
+    )
+    api = (api_class or SimulatedBigcommerce)(store)
+
+    synced = sum(1 for _ in api.resource(resource))
+    seconds = store.clock.now
+
+    return {
+        'quota': quota,
+        'rows': synced,
+        'requests': store.requests,
+        'rate_limited': store.rate_limited,
+        'seconds': round(seconds, 3),
+        'idle_seconds': round(store.clock.idle, 3),
+        'rows_per_second': round(synced / seconds, 3) if seconds else None
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(
+        description='Simulate rate limiting across BigCommerce quota tiers'
+    )
+    parser.add_argument('--rows', type=int, default=1000)
+    parser.add_argument('--resource', default='orders')
+    parser.add_argument('--latency', type=float, default=DEFAULT_LATENCY)
+    args = parser.parse_args()
+
+    columns = ['quota', 'rows', 'requests', 'rate_limited', 'seconds',
+               'idle_seconds', 'rows_per_second']
+    print('{:<12}'.format('tier') + ''.join(
+        '{:>16}'.format(c) for c in columns))
+
+    for tier, quota in QUOTA_TIERS.items():
+        report = simulate(
+            quota, rows=args.rows, resource=args.resource,
+            latency=args.latency
+        )
+        print('{:<12}'.format(tier) + ''.join(
+            '{:>16}'.format(str(report[c])) for c in columns))
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,208 @@
+#!/usr/bin/env python
+"""
+Multi-store mode.
+
+When the config contains a `stores` list, every store is synced
+concurrently in one process. Each store gets its own `BigCommerce`
+client, but all clients share one pool of request threads and one HTTP
+connection pool.
+
+Requests are dispatched by a `FairExecutor`: each store submits work
+through its own lane, and idle workers take the next request from the
+lanes in round-robin order. A store queueing 150 nested resource
+requests for a page therefore can't starve the page requests of the
+other stores.
+
+Output is namespaced by store (see `tap_bigcommerce.output.StoreOutput`)
+and state is kept per store under `stores`.
+"""
+from collections import deque
+from concurrent.futures import Executor
+from concurrent.futures import ThreadPoolExecutor, as_completed
+
+import singer
+from requests.adapters import HTTPAdapter
+
+from tap_bigcommerce.cassette import cassette_from_config
+from tap_bigcommerce.client import BigCommerce
+from tap_bigcommerce.deadline import deadline_from_config
+from tap_bigcommerce.output import MultiStoreState, StoreOutput
+from tap_bigcommerce.scheduler import scheduler_from_config
+from tap_bigcommerce.workers import WorkerPool
+
+
+logger = singer.get_logger().getChild('tap-bigcommerce')
+
+DEFAULT_MAX_WORKERS = 32
+
+DEFAULT_MAX_CONCURRENT_STORES = 8
+
+# config keys that are not shared between stores
+STORE_PATH_KEYS = [
+    'fingerprint_path', 'nested_cache_path', 'http_cache_path', 'trace_path'
+]
+
+# config keys that are not supported in multi-store mode
+UNSUPPORTED_KEYS = [
+    'transform_workers', 'plan_only', 'target_ids_path', 'daemon'
+]
+
+# config keys that are not shared with the stores
+STORE_EXCLUDED_KEYS = ['stores'] + UNSUPPORTED_KEYS
+
+
+class Lane(Executor):
+    """
+    A store's view of the shared `FairExecutor`.
+    """
+
+    def __init__(self, executor, name=None):
+        self.executor = executor
+        self.name = name
+        self.queue = deque()
+
+    def submit(self, fn, *args, **kwargs):
+        return self.executor.submit_to_lane(self, fn, args, kwargs)
+
+    def shutdown(self, wait=True):
+        # the shared executor is shut down by its owner
+        pass
+
+
+class FairExecutor(WorkerPool):
+
+    def __init__(self, max_workers=DEFAULT_MAX_WORKERS):
+        self.lanes = []
+        self.next_lane = 0
+        super().__init__(max_workers)
+
+    def lane(self, name=None):
+        lane = Lane(self, name)
+        with self.condition:
+            self.lanes.append(lane)
+        return lane
+
+    def submit_to_lane(self, lane, fn, args, kwargs):
+        return self._submit(lane.queue.append, fn, args, kwargs)
+
+    def _next_item(self):
+        """
+        Pop the next item, visiting lanes in round-robin order. Must be
+        called with the condition held.
+        """
+        count = len(self.lanes)
+        for i in range(count):
+            index = (self.next_lane + i) % count
+            lane = self.lanes[index]
+            if lane.queue:
+                self.next_lane = (index + 1) % count
+                return lane.queue.popleft()
+        return None
+
+
+def store_config(config, store):
+    """
+    Merge a store's credentials and overrides over the shared config.
+    """
+    merged = {
+        k: v for k, v in config.items() if k not in STORE_EXCLUDED_KEYS
+    }
+    for key in STORE_PATH_KEYS:
+        if key in merged and key not in store:
+            merged[key] = '{}.{}'.format(merged[key], store['store_hash'])
+    merged.update(store)
+    return merged
+
+
+def check_stores_config(config):
+    """
+    Raise if the config, or a store's overrides, set a key that isn't
+    supported in multi-store mode, instead of ignoring it.
+    """
+    unsupported = [
+        key for key in UNSUPPORTED_KEYS
+        if config.get(key) or
+        any(store.get(key) for store in config['stores'])
+    ]
+    if unsupported:
+        raise Exception(
+            "Not supported with `stores`: {}".format(', '.join(unsupported))
+        )
+
+
+def sync_stores(config, catalog, state, do_sync):
+    """
+    Sync every store in `config['stores']` concurrently, with `do_sync`
+    called once per store with its own client, state and output.
+    """
+    check_stores_config(config)
+    stores = config['stores']
+    max_workers = config.get('max_workers', DEFAULT_MAX_WORKERS)
+    executor = FairExecutor(max_workers)
+    pool_kwargs = {
+        'pool_connections': len(stores),
+        'pool_maxsize': max_workers
+    }
+    # one cassette records or replays the traffic of every store
+    adapter = cassette_from_config(config, **pool_kwargs) or \
+        HTTPAdapter(**pool_kwargs)
+    multi_state = MultiStoreState((state or {}).get('stores', {}))
+    # shared so stream weights apply across stores. Every store's
+    # requests then run on its threads rather than the executor's, so
+    # it gets `max_workers` threads unless `scheduler_workers` is set
+    scheduler = scheduler_from_config(
+        {'scheduler_workers': max_workers, **config})
+    # shared so stores that start late don't get the full max_runtime
+    deadline = deadline_from_config(config)
+
+    def sync_store(store):
+        store_hash = store['store_hash']
+        merged = store_config(config, store)
+
+        client = BigCommerce(
+            client_id=merged['client_id'],
+            access_token=merged['access_token'],
+            store_hash=store_hash,
+            executor=executor.lane(store_hash),
+            adapter=adapter,
+            customers_version=merged.get('customers_api_version', 2),
+            orders_expansion=merged.get('orders_expansion')
+        )
+        client.api.scheduler = scheduler
+        client.api.deadline = deadline
+
+        do_sync(
+            client=client,
+            catalog=catalog,
+            state=multi_state.get(store_hash),
+            start_date=merged['start_date'],
+            config=merged,
+            output=StoreOutput(store_hash, multi_state)
+        )
+
+    failed = []
+    with ThreadPoolExecutor(
+            max_workers=config.get(
+                'max_concurrent_stores', DEFAULT_MAX_CONCURRENT_STORES)
+    ) as pool:
+        futures = {
+            pool.submit(sync_store, store): store['store_hash']
+            for store in stores
+        }
+        for future in as_completed(futures):
+            store_hash = futures[future]
+            try:
+                future.result()
+                logger.info("%s: Finished store sync", store_hash)
+            except Exception as e:
+                logger.error("%s: Store sync failed: %s", store_hash, e)
+                failed.append(store_hash)
+
+    executor.shutdown()
+    if scheduler is not None:
+        scheduler.shutdown()
+
+    if failed:
+        raise Exception(
+            "Sync failed for stores: {}".format(', '.join(failed))
+        )
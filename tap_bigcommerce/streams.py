@@ -2,14 +2,53 @@
 from singer import metadata
 from singer import utils
 import os
+import bisect
 import singer
 import tap_bigcommerce.utilities as tap_utils
+from tap_bigcommerce.deadline import DeadlineReached
 
 
 logger = singer.get_logger().getChild('tap-bigcommerce')
 
 schema_loader = tap_utils.SchemaLoader()
 
+DATE_REPLICATION_KEYS = [
+    'date_modified', 'date_created', 'product_date_modified'
+]
+
+# most id ranges a sorted stream's checkpoint keeps; the lowest ranges
+# are dropped beyond this, and their rows emitted again on resume
+MAX_EMITTED_RANGES = 1000
+
+
+def add_emitted_id(ranges, id):
+    """
+    Add an integer id to a sorted list of [first, last] id ranges,
+    merging adjacent ranges.
+    """
+    i = bisect.bisect_right([r[0] for r in ranges], id)
+    if i > 0 and ranges[i - 1][1] >= id:
+        return
+
+    after_left = i > 0 and ranges[i - 1][1] == id - 1
+    before_right = i < len(ranges) and ranges[i][0] == id + 1
+    if after_left and before_right:
+        ranges[i - 1][1] = ranges.pop(i)[1]
+    elif after_left:
+        ranges[i - 1][1] = id
+    elif before_right:
+        ranges[i][0] = id
+    else:
+        ranges.insert(i, [id, id])
+
+    if len(ranges) > MAX_EMITTED_RANGES:
+        del ranges[0]
+
+
+def emitted_ids_contain(ranges, id):
+    i = bisect.bisect_right([r[0] for r in ranges], id)
+    return i > 0 and ranges[i - 1][1] >= id
+
 
 def get_abs_path(path):
     return os.path.join(os.path.dirname(os.path.realpath(__file__)), path)
@@ -26,6 +65,11 @@ class Stream():
     filter_records_by_bookmark = False
     auto_select_fields = True
     sync_full_table_every = 24
+    fingerprints = None
+    windowed = False
+    checkpoint = None
+    # False if the planner's count isn't a count of this stream's rows
+    plan_counts_rows = True
 
     def __init__(self, client):
         self.client = client
@@ -39,12 +83,22 @@ class Stream():
         if bookmark is None:
             return True
 
-        if self.replication_key in ['date_modified', 'date_created']:
+        if self.replication_key in DATE_REPLICATION_KEYS:
             return utils.strptime_with_tz(
                 value) > utils.strptime_with_tz(bookmark)
         else:
             return value > bookmark
 
+    def is_bookmark_equal(self, value, bookmark):
+        if value is None or bookmark is None:
+            return False
+
+        if self.replication_key in DATE_REPLICATION_KEYS:
+            return utils.strptime_with_tz(
+                value) == utils.strptime_with_tz(bookmark)
+        else:
+            return value == bookmark
+
     def update_session_bookmark_if_old(self, value):
         if self.session_bookmark is None:
             self.session_bookmark = value
@@ -64,6 +118,112 @@ class Stream():
                 self.session_bookmark
             )
 
+    def get_checkpoint(self, state):
+        return singer.get_bookmark(state, self.name, 'checkpoint') or {}
+
+    def parse_replication_value(self, value):
+        if self.replication_key in DATE_REPLICATION_KEYS:
+            return utils.strptime_with_tz(value)
+        return value
+
+    def make_cursor(self):
+        """
+        Build the cursor passed down to the client from the checkpoint.
+
+        Windowed streams resume at the recorded window and page. Sorted
+        streams re-query from the bookmark. In both cases rows that were
+        already emitted (same id and replication value) are skipped
+        before their sub-resources are requested.
+        """
+        emitted = set()
+        for key, value in self.checkpoint.get('emitted', []):
+            emitted.add((key, self.parse_replication_value(value)))
+
+        ranges = self.checkpoint.get('emitted_ids')
+        ranges_value = None
+        if ranges:
+            ranges_value = self.parse_replication_value(
+                self.checkpoint['value'])
+
+        def skip(row):
+            try:
+                key, value = self.skip_position(row)
+                value = self.parse_replication_value(value)
+                if (key, value) in emitted:
+                    return True
+                return bool(ranges) and value == ranges_value and \
+                    emitted_ids_contain(ranges, key)
+            except Exception:
+                return False
+
+        cursor = {'skip': skip if emitted or ranges else None}
+        if self.windowed:
+            cursor['window'] = self.checkpoint.get('window')
+            cursor['page'] = self.checkpoint.get('page', 1)
+            cursor['limit'] = self.checkpoint.get('limit')
+        return cursor
+
+    def skip_position(self, row):
+        """
+        The (key, replication value) of a row as returned by the API,
+        matched against the checkpoint's emitted rows.
+        """
+        return row.get('id'), row[self.replication_key]
+
+    def checkpoint_key(self, item):
+        return item.get('id')
+
+    def is_new(self, value):
+        """
+        Rows at exactly the bookmark value are only new for sorted
+        streams with a checkpoint, as rows already emitted at that
+        value are skipped by the client.
+        """
+        if self.is_bookmark_old(value, self.bookmark_start):
+            return True
+
+        has_emitted = 'emitted' in self.checkpoint or \
+            'emitted_ids' in self.checkpoint
+        return not self.windowed and has_emitted and \
+            self.is_bookmark_equal(value, self.bookmark_start)
+
+    def update_checkpoint(self, state, cursor, value, key):
+        """
+        Record the position of the last emitted row.
+
+        Windowed streams keep the window, page and rows emitted on that
+        page. Sorted streams keep the ids of the rows emitted at the
+        bookmark value as [first, last] ranges, as a bulk update can
+        stamp any number of rows with the same value.
+        """
+        checkpoint = self.checkpoint
+
+        if self.windowed:
+            position = (cursor.get('window'), cursor.get('page'))
+            if position != (checkpoint.get('window'), checkpoint.get('page')):
+                checkpoint['emitted'] = []
+            checkpoint['bookmark'] = self.bookmark_start
+            checkpoint['window'] = cursor.get('window')
+            checkpoint['page'] = cursor.get('page')
+            checkpoint['limit'] = cursor.get('limit')
+            checkpoint.setdefault('emitted', []).append([key, value])
+        else:
+            if not self.is_bookmark_equal(value, checkpoint.get('value')):
+                checkpoint = self.checkpoint = {
+                    'value': value, 'emitted_ids': []}
+            add_emitted_id(checkpoint.setdefault('emitted_ids', []), key)
+
+        singer.write_bookmark(state, self.name, 'checkpoint', checkpoint)
+
+    def clear_checkpoint(self, state):
+        """
+        Windowed checkpoints are only meaningful while a run is in
+        progress. Sorted streams keep their boundary ids.
+        """
+        if self.windowed:
+            state.get('bookmarks', {}).get(self.name, {}).pop(
+                'checkpoint', None)
+
     def load_schema(self):
         return schema_loader.load(self.name)
 
@@ -121,6 +281,57 @@ class Stream():
 
         return metadata.to_list(mdata)
 
+    def record_key(self, item):
+        return '-'.join(str(item.get(k)) for k in self.key_properties)
+
+    def has_changed(self, item):
+        """
+        Returns False if a fingerprint store is configured and the
+        record's content is unchanged since it was last emitted.
+        """
+        if self.fingerprints is None:
+            return True
+        return self.fingerprints.has_changed(
+            self.name, self.record_key(item), item
+        )
+
+    def record_written(self, item):
+        """
+        Called with a record yielded by `sync`, as returned by the client,
+        once it has been written, so it is only suppressed as unchanged
+        after it has been emitted.
+        """
+        if self.fingerprints is not None:
+            self.fingerprints.update(self.name, self.record_key(item), item)
+
+    def selected_fields(self):
+        """
+        Top level fields the Transformer will keep for this stream's
+        catalog entry, or None if no field has been deselected.
+        """
+        if self.stream is None:
+            return None
+
+        mdata = metadata.to_map(self.stream.metadata)
+        fields = []
+        deselected = False
+
+        for breadcrumb, field_metadata in mdata.items():
+            if len(breadcrumb) != 2 or breadcrumb[0] != 'properties':
+                continue
+
+            inclusion = field_metadata.get('inclusion')
+            if inclusion != 'automatic' and (
+                field_metadata.get('selected') is False or
+                inclusion == 'unsupported'
+            ):
+                deselected = True
+                continue
+
+            fields.append(breadcrumb[1])
+
+        return fields if deselected else None
+
     def is_selected(self):
         return self.stream is not None
 
@@ -129,34 +340,57 @@ class Stream():
         get_data = getattr(self.client, self.name)
 
         if self.replication_method == "INCREMENTAL":
+            self.checkpoint = self.get_checkpoint(state)
             self.bookmark_start = self.get_bookmark(state)
+            # only windowed checkpoints hold the start of the run
+            if self.checkpoint.get('bookmark'):
+                self.bookmark_start = self.checkpoint['bookmark']
+
+            cursor = self.make_cursor()
             res = get_data(
                 replication_key=self.replication_key,
-                bookmark=self.bookmark_start
+                bookmark=self.bookmark_start,
+                cursor=cursor,
+                fields=self.selected_fields()
             )
-            for i, item in enumerate(res):
-                try:
-                    replication_value = item[self.replication_key]
-
-                    if self.is_bookmark_old(replication_value,
-                                            self.bookmark_start):
-
-                        yield (self.stream, item)
-
-                        self.update_session_bookmark_if_old(replication_value)
-                        self.update_bookmark_if_old(state)
-
-                except Exception as e:
-                    logger.error(
-                        'Handled exception: {error}'.format(error=str(e))
-                    )
-                    pass
+            try:
+                for i, item in enumerate(res):
+                    try:
+                        replication_value = item[self.replication_key]
+
+                        if self.is_new(replication_value):
+
+                            if self.has_changed(item):
+                                yield (self.stream, item)
+
+                            self.update_session_bookmark_if_old(
+                                replication_value)
+                            self.update_bookmark_if_old(state)
+                            self.update_checkpoint(
+                                state, cursor, replication_value,
+                                self.checkpoint_key(item))
+
+                    except Exception as e:
+                        logger.error(
+                            'Handled exception: {error}'.format(error=str(e))
+                        )
+                        pass
+            except DeadlineReached as e:
+                # keep the checkpoint so the next run resumes from here
+                logger.info('%s: %s', self.name, e)
+                return
+
+            self.clear_checkpoint(state)
 
         elif self.replication_method == "FULL_TABLE":
             res = get_data()
 
-            for item in res:
-                yield (self.stream, item)
+            try:
+                for item in res:
+                    if self.has_changed(item):
+                        yield (self.stream, item)
+            except DeadlineReached as e:
+                logger.info('%s: %s', self.name, e)
 
         else:
             raise Exception(
@@ -183,9 +417,72 @@ class Coupons(Stream):
 class Customers(Stream):
     name = "customers"
 
+    @property
+    def windowed(self):
+        # the v2 endpoint is queried in day windows, see BigCommerce.customers
+        return getattr(self.client, 'customers_version', 2) == 2
+
+
+class ProductChildStream(Stream):
+    """
+    A product sub-resource, replicated by its product's date_modified.
+
+    The client skips products, not children, so the checkpoint records
+    the products whose children have all been emitted: a product is
+    recorded when the first child of the next product arrives, or when
+    the sync completes.
+    """
+    replication_key = 'product_date_modified'
+    plan_counts_rows = False
+    pending = None
+
+    def skip_position(self, row):
+        return row.get('id'), row['date_modified']
+
+    def checkpoint_key(self, item):
+        return item.get('product_id')
+
+    def update_checkpoint(self, state, cursor, value, key):
+        if self.pending is not None and self.pending != (value, key):
+            super().update_checkpoint(state, cursor, *self.pending)
+
+        # rows at a new value aren't all emitted yet, but must still be
+        # treated as new on the next run
+        if not self.is_bookmark_equal(value, self.checkpoint.get('value')):
+            self.checkpoint = {'value': value, 'emitted_ids': []}
+            singer.write_bookmark(state, self.name, 'checkpoint',
+                                  self.checkpoint)
+
+        self.pending = (value, key)
+
+    def clear_checkpoint(self, state):
+        if self.pending is not None:
+            super().update_checkpoint(state, {}, *self.pending)
+            self.pending = None
+
+
+class ProductVariants(ProductChildStream):
+    name = "product_variants"
+
+
+class ProductImages(ProductChildStream):
+    name = "product_images"
+
+
+class ProductCustomFields(ProductChildStream):
+    name = "product_custom_fields"
+
+
+class ProductModifiers(ProductChildStream):
+    name = "product_modifiers"
+
 
 STREAMS = {
     'products': Products,
+    'product_variants': ProductVariants,
+    'product_images': ProductImages,
+    'product_custom_fields': ProductCustomFields,
+    'product_modifiers': ProductModifiers,
     'coupons': Coupons,
     'customers': Customers,
     'orders': Orders
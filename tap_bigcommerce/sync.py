@@ -4,30 +4,136 @@ import singer.metrics as metrics
 from singer import metadata
 from singer import Transformer
 
+from tap_bigcommerce.output import Output
+from tap_bigcommerce.parallel import serialize_records
+
 logger = singer.get_logger().getChild('tap-bigcommerce')
 
 
-def sync_stream(state, instance):
+def sync_stream(state, instance, batch_writer=None, transform_pool=None,
+                progress=None, output=None, passthrough=None,
+                row_transform=None):
+    """
+    Sync a single stream, writing records as RECORD messages or, if a
+    `batch_writer` is given, to batch files. In batch mode STATE is only
+    written once the batch file holding the preceding records is durable.
+
+    Records for which `passthrough(record)` is true already match the
+    schema and skip the Transformer (see `tap_bigcommerce.passthrough`).
+
+    With a `transform_pool`, records come from the client unfiltered and
+    `row_transform` (excluded paths, date fields) is applied in the pool.
+    """
     stream = instance.stream
+    output = output or Output()
+    schema = stream.schema.to_dict()
+    mdata = metadata.to_map(stream.metadata)
 
     with metrics.record_counter(stream.tap_stream_id) as counter:
-        for (stream, record) in instance.sync(state):
+        if transform_pool is not None:
+            sync_records_in_pool(
+                state, instance, counter, batch_writer, transform_pool,
+                progress, output, row_transform)
+            return counter.value
+
+        for (stream, item) in instance.sync(state):
             counter.increment()
+            if progress is not None:
+                progress.update(counter.value)
 
             try:
-                with Transformer() as transformer:
-                    record = transformer.transform(
-                        record,
-                        stream.schema.to_dict(),
-                        metadata.to_map(stream.metadata)
-                    )
-                singer.write_record(stream.tap_stream_id, record)
+                record = item
+                if passthrough is None or not passthrough(record):
+                    with Transformer() as transformer:
+                        record = transformer.transform(record, schema, mdata)
+
+                if batch_writer is not None:
+                    rotated = batch_writer.write(stream.tap_stream_id, record)
+                    instance.record_written(item)
+                    if rotated:
+                        output.write_state(state)
+                    continue
+
+                output.write_record(stream.tap_stream_id, record)
+                instance.record_written(item)
 
                 if counter.value % 1000 == 0:
-                    singer.write_state(state)
+                    output.write_state(state)
 
             except Exception as e:
                 logger.error('Handled exception: {error}'.format(error=str(e)))
                 continue
 
+        if batch_writer is not None:
+            batch_writer.flush(stream.tap_stream_id)
+
+        if progress is not None:
+            progress.log()
+
         return counter.value
+
+
+def sync_records_in_pool(state, instance, counter, batch_writer,
+                         transform_pool, progress=None, output=None,
+                         row_transform=None):
+    """
+    Buffer records and hand them to the transform pool, which filters
+    excluded paths, transforms dates, runs the Transformer and
+    serializes each record in worker processes. Results
+    come back in order and STATE is written after each buffer is
+    flushed (in batch mode, only once the buffered records are durable).
+    """
+    output = output or Output()
+    stream = instance.stream
+    stream_name = stream.tap_stream_id
+    schema = stream.schema.to_dict()
+    mdata = metadata.to_map(stream.metadata)
+    buffer_size = transform_pool.workers * transform_pool.chunk_size
+    exclude_paths, date_fields = row_transform or ([], [])
+
+    def flush(rows):
+        rotated = False
+        records_json = []
+        written = []
+        results = transform_pool.map(
+            serialize_records, rows, schema, mdata, exclude_paths, date_fields)
+        for row, (record_json, error) in zip(rows, results):
+            if error is not None:
+                logger.error('Handled exception: {error}'.format(error=error))
+                continue
+
+            if batch_writer is not None:
+                rotated = batch_writer.write_serialized(
+                    stream_name, record_json) or rotated
+                instance.record_written(row)
+            else:
+                records_json.append(record_json)
+                written.append(row)
+
+        if batch_writer is None:
+            output.write_record_json(stream_name, records_json)
+            for row in written:
+                instance.record_written(row)
+            output.write_state(state)
+        elif rotated:
+            batch_writer.flush(stream_name)
+            output.write_state(state)
+
+    rows = []
+    for (_, record) in instance.sync(state):
+        counter.increment()
+        if progress is not None:
+            progress.update(counter.value)
+        rows.append(record)
+
+        if len(rows) >= buffer_size:
+            flush(rows)
+            rows = []
+
+    flush(rows)
+
+    if batch_writer is not None:
+        batch_writer.flush(stream_name)
+
+    if progress is not None:
+        progress.log()
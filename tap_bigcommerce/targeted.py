@@ -0,0 +1,143 @@
+#!/usr/bin/env python
+"""
+Targeted sync of specific rows by id.
+
+When `target_ids_path` is set, only the listed orders, products and
+customers are synced, fetched directly by id, and bookmarks are neither
+read nor written. The path is either a file or a queue directory: every
+file in the directory is read, and renamed with a `.done` suffix once
+its rows have been emitted.
+
+Each line of a file is either `stream,id`:
+
+    orders,100
+    products,77
+
+or a JSON object, either `{"stream": "orders", "id": 100}` or a
+BigCommerce webhook payload:
+
+    {"scope": "store/order/updated", "data": {"type": "order", "id": 100}}
+"""
+import os
+import json
+
+import singer
+import singer.metrics as metrics
+from singer import metadata
+from singer import Transformer
+
+from tap_bigcommerce.output import Output
+from tap_bigcommerce.streams import STREAMS
+
+
+logger = singer.get_logger().getChild('tap-bigcommerce')
+
+TARGET_STREAMS = ['orders', 'products', 'customers']
+
+# webhook `data.type` to stream
+WEBHOOK_TYPES = {
+    'order': 'orders',
+    'product': 'products',
+    'customer': 'customers'
+}
+
+DONE_SUFFIX = '.done'
+
+
+def parse_target(line):
+    """
+    Returns (stream, id) for a line, or None for blank lines and
+    comments.
+    """
+    line = line.strip()
+    if not line or line.startswith('#'):
+        return None
+
+    if line.startswith('{'):
+        obj = json.loads(line)
+        data = obj.get('data') or {}
+        stream = obj.get('stream') or WEBHOOK_TYPES.get(data.get('type'))
+        id = obj.get('id', data.get('id'))
+    else:
+        stream, id = [part.strip() for part in line.split(',', 1)]
+
+    if stream not in TARGET_STREAMS:
+        raise Exception("Targeted sync not supported for: {}".format(line))
+
+    return stream, int(id)
+
+
+def target_files(path):
+    if not os.path.isdir(path):
+        return [path]
+
+    return sorted(
+        os.path.join(path, name) for name in os.listdir(path)
+        if not name.startswith('.') and not name.endswith(DONE_SUFFIX) and
+        os.path.isfile(os.path.join(path, name))
+    )
+
+
+def read_targets(path):
+    """
+    Returns a dict of stream name to sorted ids, and the files read.
+    """
+    targets = {}
+    files = target_files(path)
+    for file_path in files:
+        with open(file_path) as f:
+            for line in f:
+                target = parse_target(line)
+                if target is not None:
+                    targets.setdefault(target[0], set()).add(target[1])
+
+    return {k: sorted(v) for k, v in targets.items()}, files
+
+
+def mark_done(path, files):
+    """
+    Rename consumed queue files so they aren't read again.
+    """
+    if not os.path.isdir(path):
+        return
+    for file_path in files:
+        os.rename(file_path, file_path + DONE_SUFFIX)
+
+
+def sync_targets(client, catalog, targets, selected_stream_names,
+                 output=None):
+    output = output or Output()
+
+    for stream in catalog.streams:
+        stream_name = stream.tap_stream_id
+        ids = targets.get(stream_name)
+        if not ids:
+            continue
+        if stream_name not in selected_stream_names:
+            logger.info("%s: Skipping targets - not selected", stream_name)
+            continue
+
+        mdata = metadata.to_map(stream.metadata)
+        schema = stream.schema.to_dict()
+        output.write_schema(
+            stream_name,
+            schema,
+            metadata.get(mdata, (), 'table-key-properties')
+        )
+
+        instance = STREAMS[stream_name](client)
+        instance.stream = stream
+
+        logger.info("%s: Syncing %s targeted rows", stream_name, len(ids))
+        with metrics.record_counter(stream_name) as counter:
+            for record in client.by_ids(
+                    stream_name, ids, fields=instance.selected_fields()):
+                with Transformer() as transformer:
+                    record = transformer.transform(record, schema, mdata)
+                output.write_record(stream_name, record)
+                counter.increment()
+
+        logger.info(
+            "%s: Completed targeted sync (%s of %s rows found)",
+            stream_name, counter.value, len(ids)
+        )
@@ -0,0 +1,119 @@
+#!/usr/bin/env python
+"""
+Per-request tracing.
+
+When `trace_path` is set, every HTTP request, every page of a resource
+and every rate limit wait is written as a span to a local file, so a
+slow page can be inspected on a timeline: the page's nested resource
+fan-out, requests queued behind others and sleeps all show up.
+
+Request spans record the URL template (ids replaced by `{id}`), page
+number, parent page span, attempt (hedged requests are sent more than
+once), status, response bytes, time spent queued and the worker thread
+that sent the request. The file is either JSON lines (one span per
+line, appended to) or, with `trace_format` set to `chrome`, a Chrome
+trace-event file that can be opened in `chrome://tracing` or Perfetto.
+"""
+import re
+import json
+import threading
+import itertools
+from urllib.parse import urlparse
+
+import singer
+
+
+logger = singer.get_logger().getChild('tap-bigcommerce')
+
+FORMATS = ['jsonl', 'chrome']
+
+
+def url_template(url):
+    """
+    The path of `url` with numeric segments replaced by `{id}`.
+    """
+    return re.sub(r'/\d+(?=/|$)', '/{id}', urlparse(url).path)
+
+
+class Tracer():
+
+    def __init__(self, path, format='jsonl'):
+        if format not in FORMATS:
+            raise Exception("Unknown trace format: {}".format(format))
+        self.path = path
+        self.format = format
+        self.lock = threading.Lock()
+        self.ids = itertools.count(1)
+        self.threads = set()
+
+        if format == 'chrome':
+            self.file = open(path, 'w')
+            self.file.write('[\n')
+            self.first = True
+        else:
+            self.file = open(path, 'a')
+
+    def next_id(self):
+        return next(self.ids)
+
+    def record(self, name, start, end, span_id=None, parent=None, **args):
+        """
+        Write a span. `start` and `end` are epoch seconds.
+        """
+        span_id = span_id or self.next_id()
+        thread = threading.current_thread()
+
+        with self.lock:
+            if self.format == 'chrome':
+                self._write_chrome(
+                    name, start, end, span_id, parent, thread, args)
+            else:
+                self.file.write(json.dumps({
+                    'id': span_id,
+                    'parent': parent,
+                    'name': name,
+                    'start': round(start, 6),
+                    'end': round(end, 6),
+                    'duration_ms': round((end - start) * 1000, 3),
+                    'thread': thread.name,
+                    **args
+                }) + '\n')
+
+        return span_id
+
+    def _write_event(self, event):
+        if not self.first:
+            self.file.write(',\n')
+        self.first = False
+        self.file.write(json.dumps(event))
+
+    def _write_chrome(self, name, start, end, span_id, parent, thread, args):
+        if thread.ident not in self.threads:
+            self.threads.add(thread.ident)
+            self._write_event({
+                'name': 'thread_name', 'ph': 'M', 'pid': 1,
+                'tid': thread.ident, 'args': {'name': thread.name}
+            })
+
+        self._write_event({
+            'name': name,
+            'ph': 'X',
+            'pid': 1,
+            'tid': thread.ident,
+            'ts': int(start * 1e6),
+            'dur': max(int((end - start) * 1e6), 0),
+            'args': {'id': span_id, 'parent': parent, **args}
+        })
+
+    def close(self):
+        with self.lock:
+            if self.format == 'chrome':
+                self.file.write('\n]\n')
+            self.file.close()
+
+
+def tracer_from_config(config):
+    if not config.get('trace_path'):
+        return None
+
+    return Tracer(config['trace_path'], config.get('trace_format', 'jsonl'))
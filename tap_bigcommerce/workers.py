@@ -0,0 +1,87 @@
+#!/usr/bin/env python
+"""
+Thread pool with a pluggable dispatch order.
+
+`WorkerPool` runs queued work on a fixed set of daemon threads, like
+`ThreadPoolExecutor`, but leaves the queues and the order in which work
+is taken from them to subclasses: `FairExecutor` (multi-store mode)
+visits stores' lanes round-robin, `PriorityScheduler` dispatches by
+priority class and stream weight.
+"""
+import abc
+import threading
+from concurrent.futures import Future
+
+
+class WorkerPool(abc.ABC):
+
+    thread_name = 'tap-bigcommerce-{}'
+
+    def __init__(self, max_workers):
+        """
+        Starts the worker threads, so subclasses set up their queues
+        before calling this.
+        """
+        self.max_workers = max_workers
+        self.condition = threading.Condition()
+        self._shutdown = False
+        self.threads = []
+
+        for i in range(max_workers):
+            thread = threading.Thread(
+                target=self._work,
+                name=self.thread_name.format(i),
+                daemon=True
+            )
+            thread.start()
+            self.threads.append(thread)
+
+    def _submit(self, enqueue, fn, args, kwargs):
+        """
+        Queue `fn(*args, **kwargs)` with `enqueue(item)`, which is called
+        with the condition held, and return its Future.
+        """
+        future = Future()
+        with self.condition:
+            if self._shutdown:
+                raise RuntimeError('cannot submit after shutdown')
+            enqueue((future, fn, args, kwargs))
+            self.condition.notify()
+        return future
+
+    @abc.abstractmethod
+    def _next_item(self):
+        """
+        Pop the next (future, fn, args, kwargs) item, or return None if
+        nothing is queued. Called with the condition held.
+        """
+
+    def _work(self):
+        while True:
+            with self.condition:
+                item = self._next_item()
+                while item is None:
+                    if self._shutdown:
+                        return
+                    self.condition.wait()
+                    item = self._next_item()
+
+            future, fn, args, kwargs = item
+            if not future.set_running_or_notify_cancel():
+                continue
+
+            try:
+                result = fn(*args, **kwargs)
+            except BaseException as e:
+                future.set_exception(e)
+            else:
+                future.set_result(result)
+
+    def shutdown(self, wait=True):
+        with self.condition:
+            self._shutdown = True
+            self.condition.notify_all()
+
+        if wait:
+            for thread in self.threads:
+                thread.join()
@@ -0,0 +1,62 @@
+import os
+import gzip
+import json
+import shutil
+import tempfile
+import unittest
+from unittest.mock import patch
+
+from tap_bigcommerce.batch import BatchWriter
+
+
+class TestBatchWriter(unittest.TestCase):
+
+    def setUp(self):
+        self.directory = tempfile.mkdtemp()
+
+    def tearDown(self):
+        shutil.rmtree(self.directory)
+
+    @patch('tap_bigcommerce.batch.write_batch')
+    def test_rotates_on_record_count(self, write_batch):
+
+        writer = BatchWriter(self.directory, max_records=2)
+
+        self.assertFalse(writer.write('orders', {'id': 1}))
+        self.assertTrue(writer.write('orders', {'id': 2}))
+        self.assertFalse(writer.write('orders', {'id': 3}))
+
+        writer.flush()
+
+        self.assertEqual(write_batch.call_count, 2)
+
+        manifest = write_batch.call_args_list[0][0][1]
+        path = manifest[0][len('file://'):]
+
+        with gzip.open(path, 'rt') as f:
+            rows = [json.loads(line) for line in f]
+
+        self.assertEqual(rows, [{'id': 1}, {'id': 2}])
+        self.assertFalse(
+            any(f.endswith('.part') for f in os.listdir(self.directory))
+        )
+
+    @patch('tap_bigcommerce.batch.write_batch')
+    def test_rotates_on_bytes(self, write_batch):
+
+        writer = BatchWriter(self.directory, max_bytes=10)
+
+        self.assertTrue(writer.write('coupons', {'name': 'a long name'}))
+        write_batch.assert_called_once()
+
+    @patch('tap_bigcommerce.batch.write_batch')
+    def test_flush_without_records(self, write_batch):
+
+        writer = BatchWriter(self.directory)
+        writer.flush('orders')
+
+        write_batch.assert_not_called()
+
+
+if __name__ == '__main__':
+    unittest.main()
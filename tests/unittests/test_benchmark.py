@@ -0,0 +1,37 @@
+import unittest
+
+from tap_bigcommerce.benchmark import make_rows, stub_nested, run, compare
+
+
+class TestBenchmark(unittest.TestCase):
+
+    def test_rows_follow_schema(self):
+        rows = make_rows('orders', 2, items=3, depth=1)
+
+        self.assertEqual([row['id'] for row in rows], [0, 1])
+        self.assertEqual(len(rows[1]['products']), 3)
+        self.assertEqual(rows[1]['date_modified'],
+                         'Tue, 01 Jan 2019 00:00:01 +0000')
+
+    def test_nested_resources_are_stubbed(self):
+        rows = make_rows('orders', 1, items=2, depth=1)
+        stubbed, get = stub_nested('orders', rows)
+
+        stub = stubbed[0]['products']
+        self.assertIn('resource', stub)
+        self.assertEqual(get(stub['url']).result().data, rows[0]['products'])
+
+    def test_run_and_compare(self):
+        results = run(records=2, resources=['orders'],
+                      sizes={'small': (1, 1)})
+
+        self.assertIn('sync_stream', results['orders/small'])
+
+        baseline = {'orders/small': {
+            name: value / 2
+            for name, value in results['orders/small'].items()
+        }}
+        rows, regressed = compare(results, baseline)
+        self.assertTrue(regressed)
+        rows, regressed = compare(results, results)
+        self.assertFalse(regressed)
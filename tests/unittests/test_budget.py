@@ -0,0 +1,85 @@
+import os
+import shutil
+import tempfile
+import unittest
+
+from tap_bigcommerce.budget import SharedBudget
+
+
+class Clock():
+
+    def __init__(self):
+        self.ms = 1000000
+
+    def __call__(self):
+        return self.ms
+
+
+class TestSharedBudget(unittest.TestCase):
+
+    def setUp(self):
+        self.directory = tempfile.mkdtemp()
+        self.path = os.path.join(self.directory, 'budget.db')
+        self.clock = Clock()
+
+    def tearDown(self):
+        shutil.rmtree(self.directory)
+
+    def test_processes_share_a_window(self):
+
+        first = SharedBudget(self.path, 'store', clock=self.clock)
+        second = SharedBudget(self.path, 'store', clock=self.clock)
+
+        first.observe({
+            'ms_until_reset': 30000,
+            'window_size_ms': 30000,
+            'requests_remaining': 150,
+            'requests_quota': 150
+        })
+
+        self.assertEqual(first.reserve(100), 0)
+        # the second process sees the first process' reservation
+        self.assertEqual(second.reserve(100), 30)
+        self.assertEqual(second.reserve(50), 0)
+
+        # the window resets
+        self.clock.ms += 30000
+        self.assertEqual(second.reserve(100), 0)
+
+    def test_observation_does_not_undo_reservations(self):
+
+        budget = SharedBudget(self.path, 'store', clock=self.clock)
+        rate_limit = {
+            'ms_until_reset': 30000,
+            'window_size_ms': 30000,
+            'requests_remaining': 150,
+            'requests_quota': 150
+        }
+        budget.observe(rate_limit)
+        budget.reserve(100)
+
+        self.clock.ms += 1000
+        budget.observe({**rate_limit, 'ms_until_reset': 29000,
+                        'requests_remaining': 140})
+
+        self.assertGreater(budget.reserve(51), 0)
+        self.assertEqual(budget.reserve(50), 0)
+
+    def test_other_stores_are_independent(self):
+
+        budget = SharedBudget(self.path, 'store', clock=self.clock)
+        other = SharedBudget(self.path, 'other', clock=self.clock)
+
+        budget.observe({
+            'ms_until_reset': 30000,
+            'window_size_ms': 30000,
+            'requests_remaining': 0,
+            'requests_quota': 150
+        })
+
+        self.assertGreater(budget.reserve(1), 0)
+        self.assertEqual(other.reserve(1), 0)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,84 @@
+import os
+import json
+import shutil
+import tempfile
+import unittest
+from unittest.mock import patch
+
+from requests import Response
+from requests.adapters import HTTPAdapter
+from requests.exceptions import ConnectionError
+
+from tap_bigcommerce.bigcommerce import Bigcommerce
+from tap_bigcommerce.cassette import RecordingAdapter, ReplayAdapter
+from tap_bigcommerce.cassette import read_cassette
+
+
+COUPONS = [
+    {'id': 1, 'code': 'A', 'date_created': '2019-01-01T00:00:00+00:00'},
+    {'id': 2, 'code': 'B', 'date_created': '2019-01-02T00:00:00+00:00'}
+]
+
+
+def upstream(request, **kwargs):
+    resp = Response()
+    resp.status_code = 200
+    resp.headers['X-Rate-Limit-Time-Reset-Ms'] = '1000'
+    resp.headers['X-Rate-Limit-Time-Window-Ms'] = '30000'
+    resp.headers['X-Rate-Limit-Requests-Left'] = '1'
+    resp.headers['X-Rate-Limit-Requests-Quota'] = '150'
+    body = {'time': 1} if '/time' in request.url else COUPONS
+    resp._content = json.dumps(body).encode('utf-8')
+    resp.url = request.url
+    resp.request = request
+    return resp
+
+
+def make_api(adapter):
+    return Bigcommerce(
+        client_id='id', access_token='token', store_hash='store',
+        adapter=adapter
+    )
+
+
+class TestCassette(unittest.TestCase):
+
+    def setUp(self):
+        self.directory = tempfile.mkdtemp()
+        self.path = os.path.join(self.directory, 'cassette.jsonl.gz')
+
+    def tearDown(self):
+        shutil.rmtree(self.directory)
+
+    def record(self):
+        with patch.object(HTTPAdapter, 'send', side_effect=upstream):
+            api = make_api(RecordingAdapter(self.path))
+            return list(api.resource('coupons'))
+
+    def test_replay_matches_recording(self):
+
+        recorded = self.record()
+        entries = read_cassette(self.path)
+
+        self.assertEqual(len(entries), 2)
+        self.assertEqual(entries[0]['headers']['X-Rate-Limit-Requests-Left'],
+                         '1')
+
+        api = make_api(ReplayAdapter(self.path, speed=0))
+        replayed = list(api.resource('coupons'))
+
+        self.assertEqual(replayed, recorded)
+        # as fast as possible: the rate limit never runs out
+        self.assertEqual(api.rate_limit['requests_remaining'], 150)
+
+    def test_unrecorded_request_fails(self):
+
+        self.record()
+        api = make_api(ReplayAdapter(self.path, speed=0))
+
+        with self.assertRaises(ConnectionError):
+            api.get(api.make_url(2, 'orders'), resolve=True)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,144 @@
+import unittest
+
+from tap_bigcommerce.client import map_customer_v3, BigCommerce
+from tap_bigcommerce.bigcommerce import map_order_consignments
+
+
+class TestCustomersV3(unittest.TestCase):
+
+    def test_map_customer_v3(self):
+
+        customer = map_customer_v3({
+            'id': 1,
+            'email': 'jane@example.com',
+            'first_name': 'Jane',
+            'date_modified': '2019-01-01T00:00:00Z',
+            'store_credit_amounts': [{'amount': 10}, {'amount': 2.5}],
+            'authentication': {'force_password_reset': False},
+            'accepts_product_review_abandoned_cart_emails': True,
+            'form_fields': [{'name': 'size', 'value': 'L', 'customer_id': 1}],
+            'addresses': [{'id': 3}]
+        })
+
+        self.assertEqual(customer['id'], 1)
+        self.assertEqual(customer['store_credit'], 12.5)
+        self.assertIs(customer['reset_pass_on_login'], False)
+        self.assertIs(customer['accepts_marketing'], True)
+        self.assertEqual(
+            customer['form_fields'], [{'name': 'size', 'value': 'L'}]
+        )
+        self.assertNotIn('addresses', customer)
+
+
+def stub(resource):
+    return {'url': 'https://example.com/' + resource, 'resource': resource}
+
+
+class TestOrderConsignments(unittest.TestCase):
+
+    def test_products_and_addresses_from_consignments(self):
+
+        order = map_order_consignments({
+            'id': 7,
+            'coupon_discount': '0.0000',
+            'products': stub('products'),
+            'shipping_addresses': stub('shipping_addresses'),
+            'coupons': stub('coupons'),
+            'consignments': [{
+                'shipping': [
+                    {'id': 1, 'city': 'Austin',
+                     'line_items': [{'id': 10}, {'id': 11}]},
+                    {'id': 2, 'city': 'Boston',
+                     'line_items': [{'id': 12}]}
+                ],
+                'downloads': [{'line_items': [{'id': 13}]}],
+                'email': {'gift_certificates': []}
+            }]
+        })
+
+        self.assertEqual([p['id'] for p in order['products']],
+                         [10, 11, 12, 13])
+        self.assertEqual(order['shipping_addresses'], [
+            {'id': 1, 'city': 'Austin', 'order_id': 7},
+            {'id': 2, 'city': 'Boston', 'order_id': 7}
+        ])
+        self.assertEqual(order['coupons'], [])
+        self.assertNotIn('consignments', order)
+
+    def test_stubs_kept_when_not_covered(self):
+
+        order = map_order_consignments({
+            'id': 7,
+            'coupon_discount': '5.0000',
+            'products': stub('products'),
+            'shipping_addresses': stub('shipping_addresses'),
+            'coupons': stub('coupons')
+        })
+
+        self.assertEqual(order['products'], stub('products'))
+        self.assertEqual(order['shipping_addresses'],
+                         stub('shipping_addresses'))
+        self.assertEqual(order['coupons'], stub('coupons'))
+
+    def test_stubs_kept_when_consignments_not_included(self):
+
+        order = map_order_consignments({
+            'id': 7,
+            'coupon_discount': '0.0000',
+            'products': stub('products'),
+            'shipping_addresses': stub('shipping_addresses'),
+            'coupons': stub('coupons'),
+            'consignments': stub('consignments')
+        })
+
+        self.assertEqual(order['products'], stub('products'))
+        self.assertEqual(order['shipping_addresses'],
+                         stub('shipping_addresses'))
+        self.assertNotIn('consignments', order)
+
+
+class MockApi():
+
+    def __init__(self, products):
+        self.products = products
+        self.calls = []
+
+    def resource(self, name, params={}, cursor=None, fields=None,
+                 stream=None):
+        self.calls.append((name, params, fields, stream))
+        return iter(self.products)
+
+
+class TestProductChildren(unittest.TestCase):
+
+    def test_rows_read_from_included_sub_resource(self):
+
+        client = BigCommerce.__new__(BigCommerce)
+        client.api = MockApi([
+            {'id': 1, 'date_modified': '2019-01-02T00:00:00+00:00',
+             'variants': [{'id': 10, 'sku': 'A'}, {'id': 11, 'sku': 'B'}]},
+            {'id': 2, 'date_modified': '2019-01-03T00:00:00+00:00',
+             'variants': []}
+        ])
+
+        rows = list(client.product_variants(
+            replication_key='product_date_modified',
+            bookmark='2019-01-01T00:00:00Z'
+        ))
+
+        self.assertEqual([(r['id'], r['product_id']) for r in rows],
+                         [(10, 1), (11, 1)])
+        self.assertEqual(rows[0]['product_date_modified'],
+                         '2019-01-02T00:00:00+00:00')
+
+        name, params, fields, stream = client.api.calls[0]
+        self.assertEqual(name, 'product_children')
+        self.assertEqual(stream, 'product_variants')
+        self.assertEqual(params['include'], 'variants')
+        self.assertEqual(fields, ['id', 'date_modified'])
+        self.assertEqual(client.resource_name('product_images'),
+                         'product_children')
+
+
+if __name__ == '__main__':
+    unittest.main()
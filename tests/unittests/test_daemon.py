@@ -0,0 +1,206 @@
+import os
+import shutil
+import tempfile
+import unittest
+from datetime import timedelta
+
+import singer
+from dateutil.parser import parse
+from singer import utils, metadata, Catalog
+
+from tap_bigcommerce import do_sync, open_resources, close_resources
+from tap_bigcommerce.client import BigCommerce
+from tap_bigcommerce.daemon import Daemon
+from tap_bigcommerce.discover import discover_streams
+from tap_bigcommerce.output import Output
+
+
+class Stop():
+    """
+    Stands in for threading.Event, recording waits instead of sleeping.
+    """
+
+    def __init__(self, polls):
+        self.polls = polls
+        self.waits = []
+
+    def is_set(self):
+        return len(self.waits) >= self.polls
+
+    def wait(self, timeout):
+        self.waits.append(timeout)
+
+
+class TestDaemon(unittest.TestCase):
+
+    def test_backs_off_when_idle(self):
+        stop = Stop(6)
+        daemon = Daemon(poll_interval=10, max_poll_interval=60, stop=stop)
+        rows = iter([5, 0, 0, 0, 0, 3])
+
+        daemon.run(lambda first: next(rows))
+
+        self.assertEqual(stop.waits, [10, 20, 40, 60, 60, 10])
+
+    def test_full_table_streams_only_on_first_poll(self):
+        stop = Stop(3)
+        daemon = Daemon(poll_interval=10, stop=stop)
+        firsts = []
+
+        def poll(first):
+            firsts.append(first)
+            return 1
+
+        daemon.run(poll)
+
+        self.assertEqual(firsts, [True, False, False])
+
+    def test_failed_poll_backs_off(self):
+        stop = Stop(2)
+        daemon = Daemon(poll_interval=10, stop=stop)
+        firsts = []
+
+        def poll(first):
+            firsts.append(first)
+            if len(firsts) == 1:
+                raise Exception('connection reset')
+            return 0
+
+        polls = daemon.run(poll)
+
+        self.assertEqual(polls, 2)
+        self.assertEqual(stop.waits, [20, 40])
+        # the first poll is retried in full
+        self.assertEqual(firsts, [True, True])
+
+
+class CustomersApi():
+    """
+    Serves v2 customers filtered by their date_modified window.
+    """
+    budget = None
+    hedger = None
+    scheduler = None
+    memory_guard = None
+    transform_pool = None
+    nested_cache = None
+    http_cache = None
+    tracer = None
+    deadline = None
+
+    def __init__(self):
+        self.customers = []
+
+    def resource(self, name, params={}, cursor=None, fields=None):
+        start = parse(params['min_date_modified'])
+        end = parse(params['max_date_modified'])
+        if (cursor or {}).get('page', 1) > 1:
+            return
+        for customer in self.customers:
+            if start <= parse(customer['date_modified']) <= end:
+                yield customer
+
+
+class RecordOutput(Output):
+
+    def __init__(self):
+        self.records = []
+
+    def write_message(self, message):
+        if isinstance(message, singer.RecordMessage):
+            self.records.append(message.record['id'])
+
+
+class Resource():
+
+    def __init__(self):
+        self.closed = False
+
+    def close(self):
+        self.closed = True
+
+
+def customers_client():
+    client = BigCommerce.__new__(BigCommerce)
+    client.authorized = True
+    client.store_hash = 'store'
+    client.customers_version = 2
+    client.utcnow = utils.now()
+    client.api = CustomersApi()
+    client.api.customers.append({
+        'id': 1,
+        'date_modified': utils.strftime(utils.now() - timedelta(hours=1))
+    })
+    return client
+
+
+def customers_catalog(client):
+    catalog = Catalog.from_dict(discover_streams(client))
+    for stream in catalog.streams:
+        if stream.tap_stream_id == 'customers':
+            stream.metadata = metadata.to_list(metadata.write(
+                metadata.to_map(stream.metadata), (), 'selected', True))
+    return catalog
+
+
+class TestDaemonPolls(unittest.TestCase):
+
+    def test_customer_changed_between_polls_is_synced(self):
+        client = customers_client()
+        catalog = customers_catalog(client)
+
+        state = {'bookmarks': {}}
+        start_date = utils.strftime(utils.now() - timedelta(days=1))
+        output = RecordOutput()
+
+        def poll(first):
+            rows = do_sync(client, catalog, state, start_date,
+                           output=output, incremental_only=not first)
+            # changed after the daemon started
+            client.api.customers.append({
+                'id': 2, 'date_modified': utils.strftime(utils.now())
+            })
+            return rows
+
+        Daemon(poll_interval=10, stop=Stop(2)).run(poll)
+
+        self.assertEqual(output.records, [1, 2])
+
+    def test_resources_kept_between_polls(self):
+        directory = tempfile.mkdtemp()
+        try:
+            client = customers_client()
+            catalog = customers_catalog(client)
+            config = {'trace_path': os.path.join(directory, 'trace.jsonl')}
+            tracer = client.api.tracer = Resource()
+            start_date = utils.strftime(utils.now() - timedelta(days=1))
+
+            for first in (True, False):
+                do_sync(client, catalog, {'bookmarks': {}}, start_date,
+                        config=config, output=RecordOutput(),
+                        incremental_only=not first)
+
+            self.assertIs(client.api.tracer, tracer)
+            self.assertFalse(tracer.closed)
+        finally:
+            shutil.rmtree(directory)
+
+    def test_open_and_close_resources(self):
+        directory = tempfile.mkdtemp()
+        try:
+            client = customers_client()
+            config = {'trace_path': os.path.join(directory, 'trace.jsonl')}
+
+            opened = open_resources(client, config)
+            tracer = client.api.tracer
+
+            self.assertEqual(opened, ['tracer'])
+            # already set, so not opened again
+            self.assertEqual(open_resources(client, config), [])
+
+            close_resources(client, opened)
+
+            self.assertIsNone(client.api.tracer)
+            self.assertTrue(tracer.file.closed)
+        finally:
+            shutil.rmtree(directory)
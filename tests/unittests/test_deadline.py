@@ -0,0 +1,52 @@
+import unittest
+
+from tap_bigcommerce.deadline import Deadline, DeadlineReached
+from tap_bigcommerce.simulator import SimulatedBigcommerce, SimulatedStore
+from tap_bigcommerce.simulator import QUOTA_TIERS
+
+
+class FakeClock():
+
+    def __init__(self):
+        self.now = 0.0
+
+    def __call__(self):
+        return self.now
+
+
+class TestDeadline(unittest.TestCase):
+
+    def test_reached_within_margin_and_stays_reached(self):
+
+        clock = FakeClock()
+        deadline = Deadline(100, margin=10, clock=clock)
+
+        clock.now = 80
+        self.assertFalse(deadline.reached())
+        # not enough time left for a 15 second page
+        self.assertTrue(deadline.reached(15))
+        self.assertTrue(deadline.reached())
+
+    def test_resource_stops_between_pages(self):
+
+        store = SimulatedStore(QUOTA_TIERS['standard'], rows=500,
+                               sub_resources=3)
+        api = SimulatedBigcommerce(store)
+        api.deadline = Deadline(
+            120, margin=0, clock=lambda: store.clock.now)
+
+        rows = []
+        with self.assertRaises(DeadlineReached):
+            for row in api.resource('orders'):
+                rows.append(row)
+
+        self.assertGreater(len(rows), 0)
+        self.assertLess(len(rows), 500)
+        # only whole pages are emitted
+        self.assertEqual(len(rows) % api.page_size('orders'), 0)
+        # no rate limit wait was started past the deadline
+        self.assertLessEqual(store.clock.now, 120)
+
+
+if __name__ == '__main__':
+    unittest.main()
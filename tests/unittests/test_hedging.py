@@ -0,0 +1,99 @@
+import time
+import threading
+import unittest
+from concurrent.futures import ThreadPoolExecutor
+
+from tap_bigcommerce.hedging import Hedger, LatencyTracker
+
+
+class TestLatencyTracker(unittest.TestCase):
+
+    def test_percentile_needs_samples(self):
+        tracker = LatencyTracker(min_samples=3)
+        tracker.record(1)
+        tracker.record(2)
+        self.assertIsNone(tracker.percentile(95))
+
+        tracker.record(3)
+        self.assertEqual(tracker.percentile(50), 2)
+        self.assertEqual(tracker.percentile(95), 3)
+
+
+class TestHedger(unittest.TestCase):
+
+    def setUp(self):
+        self.executor = ThreadPoolExecutor(max_workers=4)
+
+    def tearDown(self):
+        self.executor.shutdown()
+
+    def warm(self, hedger, seconds=0.01):
+        for _ in range(hedger.latency.min_samples):
+            hedger.latency.record(seconds)
+
+    def test_fast_request_is_not_hedged(self):
+        hedger = Hedger(min_samples=5, max_ratio=1)
+        self.warm(hedger, 0.5)
+
+        future = hedger.submit(self.executor, lambda: 'response')
+
+        self.assertEqual(future.result(timeout=1), 'response')
+        self.assertEqual(hedger.stats()['hedges'], 0)
+
+    def test_slow_request_is_hedged(self):
+        hedger = Hedger(min_samples=5, max_ratio=1)
+        self.warm(hedger)
+        release = threading.Event()
+        calls = []
+
+        def send():
+            calls.append(1)
+            if len(calls) == 1:
+                # the first attempt stalls until the test ends
+                release.wait(5)
+                return 'slow'
+            return 'fast'
+
+        future = hedger.submit(self.executor, send)
+
+        self.assertEqual(future.result(timeout=2), 'fast')
+        self.assertEqual(hedger.stats(),
+                         {'requests': 1, 'hedges': 1, 'wins': 1})
+        release.set()
+
+    def test_hedges_are_capped(self):
+        hedger = Hedger(min_samples=5, max_ratio=0)
+        self.warm(hedger)
+
+        def send():
+            time.sleep(0.1)
+            return 'response'
+
+        future = hedger.submit(self.executor, send)
+
+        self.assertEqual(future.result(timeout=1), 'response')
+        self.assertEqual(hedger.stats()['hedges'], 0)
+
+    def test_hedge_can_be_vetoed(self):
+        hedger = Hedger(min_samples=5, max_ratio=1)
+        self.warm(hedger)
+
+        def send():
+            time.sleep(0.1)
+            return 'response'
+
+        future = hedger.submit(self.executor, send, allow=lambda: False)
+
+        self.assertEqual(future.result(timeout=1), 'response')
+        self.assertEqual(hedger.stats()['hedges'], 0)
+
+    def test_error_is_raised_when_all_attempts_fail(self):
+        hedger = Hedger()
+
+        def send():
+            raise ValueError('failed')
+
+        future = hedger.submit(self.executor, send)
+
+        with self.assertRaises(ValueError):
+            future.result(timeout=1)
@@ -0,0 +1,92 @@
+import os
+import json
+import shutil
+import tempfile
+import unittest
+
+from tap_bigcommerce.bigcommerce import Bigcommerce
+from tap_bigcommerce.http_cache import HttpCache, request_url
+
+
+URL = 'https://api.bigcommerce.com/stores/abc/v2/coupons'
+
+
+class Request():
+
+    def __init__(self, url):
+        self.url = url
+
+
+class Response():
+
+    def __init__(self, status_code, url, payload=None, headers=None):
+        self.status_code = status_code
+        self.request = Request(url)
+        self.text = json.dumps(payload)
+        self.payload = payload
+        self.headers = headers or {}
+
+    def json(self):
+        return self.payload
+
+
+class TestHttpCache(unittest.TestCase):
+
+    def setUp(self):
+        self.directory = tempfile.mkdtemp()
+        self.path = os.path.join(self.directory, 'http.db')
+        self.cache = HttpCache(self.path)
+
+    def tearDown(self):
+        self.cache.close()
+        shutil.rmtree(self.directory)
+
+    def test_validators_are_sent_once_cached(self):
+        params = {'page': 1, 'limit': 50}
+        key = request_url(URL, params)
+
+        self.assertEqual(self.cache.validators(URL, params), {})
+
+        self.cache.store(key, Response(200, key, [], {
+            'ETag': '"abc"',
+            'Last-Modified': 'Tue, 01 Jan 2019 00:00:00 GMT'
+        }))
+
+        self.assertEqual(self.cache.validators(URL, params), {
+            'If-None-Match': '"abc"',
+            'If-Modified-Since': 'Tue, 01 Jan 2019 00:00:00 GMT'
+        })
+
+    def test_responses_without_validators_are_not_cached(self):
+        key = request_url(URL, {})
+        self.cache.store(key, Response(200, key, [{'id': 1}]))
+
+        self.assertIsNone(self.cache.body(key))
+
+    def test_not_modified_is_served_from_cache(self):
+        api = Bigcommerce.__new__(Bigcommerce)
+        api.request_count = 0
+        api.http_cache = self.cache
+
+        params = {'page': 1}
+        key = request_url(URL, params)
+        self.cache.validators(URL, params)
+
+        api._response_hook(
+            Response(200, key, [{'id': 1}], {'ETag': '"abc"'}))
+
+        not_modified = Response(304, key)
+        api._response_hook(not_modified)
+
+        self.assertEqual(not_modified.data, [{'id': 1}])
+        self.assertEqual(self.cache.hits, 1)
+
+    def test_untracked_responses_are_not_cached(self):
+        api = Bigcommerce.__new__(Bigcommerce)
+        api.request_count = 0
+        api.http_cache = self.cache
+
+        key = request_url(URL + '/1', {})
+        api._response_hook(Response(200, key, {'id': 1}, {'ETag': '"x"'}))
+
+        self.assertIsNone(self.cache.body(key))
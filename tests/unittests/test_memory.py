@@ -0,0 +1,58 @@
+import unittest
+
+from tap_bigcommerce.memory import MemoryGuard, MIN_SCALE
+from tap_bigcommerce.simulator import SimulatedBigcommerce, SimulatedStore
+
+
+MB = 1024 * 1024
+
+
+class Usage():
+
+    def __init__(self, values):
+        self.values = list(values)
+
+    def __call__(self):
+        if len(self.values) > 1:
+            return self.values.pop(0)
+        return self.values[0]
+
+
+def guard(values, limit=100 * MB):
+    memory_guard = MemoryGuard(limit)
+    memory_guard.usage = Usage(values)
+    return memory_guard
+
+
+class TestMemoryGuard(unittest.TestCase):
+
+    def test_scale(self):
+        memory_guard = guard([50 * MB, 90 * MB, 100 * MB, 50 * MB])
+
+        self.assertEqual(memory_guard.scale(), 1.0)
+        self.assertAlmostEqual(memory_guard.scale(), 0.5)
+        self.assertEqual(memory_guard.scale(), MIN_SCALE)
+        self.assertEqual(memory_guard.scale(), 1.0)
+
+    def test_high_water_per_stream(self):
+        memory_guard = guard([10 * MB, 30 * MB, 20 * MB, 5 * MB])
+
+        memory_guard.start('orders')
+        memory_guard.scale()
+        memory_guard.scale()
+        memory_guard.finish()
+        memory_guard.start('products')
+
+        self.assertEqual(memory_guard.high_water,
+                         {'orders': 30 * MB, 'products': 5 * MB})
+
+    def test_resource_rows_survive_page_size_changes(self):
+        store = SimulatedStore(quota=7000000, rows=500, sub_resources=3)
+        api = SimulatedBigcommerce(store)
+        api.memory_guard = guard(
+            [10 * MB, 90 * MB, 95 * MB, 85 * MB, 10 * MB, 92 * MB]
+        )
+
+        ids = [row['id'] for row in api.resource('orders')]
+
+        self.assertEqual(ids, list(range(1, 501)))
@@ -0,0 +1,66 @@
+import os
+import shutil
+import tempfile
+import unittest
+
+from tap_bigcommerce.nested_cache import NestedResourceCache
+from tap_bigcommerce.simulator import SimulatedBigcommerce, SimulatedStore
+
+
+class TestNestedResourceCache(unittest.TestCase):
+
+    def setUp(self):
+        self.directory = tempfile.mkdtemp()
+        self.path = os.path.join(self.directory, 'nested.db')
+
+    def tearDown(self):
+        shutil.rmtree(self.directory)
+
+    def test_hit_requires_same_date_modified(self):
+        cache = NestedResourceCache(self.path)
+        row = {'id': 1, 'date_modified': '2019-01-01'}
+        cache.put('orders', row, {'products': [{'id': 10}]})
+
+        self.assertEqual(cache.get('orders', row),
+                         {'products': [{'id': 10}]})
+        self.assertIsNone(
+            cache.get('orders', {'id': 1, 'date_modified': '2019-01-02'}))
+        self.assertIsNone(cache.get('products', row))
+
+    def test_persists_between_instances(self):
+        cache = NestedResourceCache(self.path)
+        row = {'id': 1, 'date_modified': '2019-01-01'}
+        cache.put('orders', row, {'products': []})
+        cache.close()
+
+        cache = NestedResourceCache(self.path)
+        self.assertEqual(cache.get('orders', row), {'products': []})
+
+    def test_evicts_least_recently_used(self):
+        cache = NestedResourceCache(self.path, max_bytes=100)
+        rows = [{'id': i, 'date_modified': '2019'} for i in range(3)]
+        for row in rows:
+            cache.put('orders', row, {'products': 'x' * 30})
+        cache.get('orders', rows[0])
+
+        cache.put('orders', {'id': 3, 'date_modified': '2019'},
+                  {'products': 'x' * 30})
+        cache.commit()
+
+        self.assertIsNotNone(cache.get('orders', rows[0]))
+        self.assertIsNone(cache.get('orders', rows[1]))
+        self.assertLessEqual(cache.size, 100)
+
+    def test_resync_skips_nested_requests(self):
+        cache = NestedResourceCache(self.path)
+        store = SimulatedStore(quota=7000000, rows=120, sub_resources=3)
+        api = SimulatedBigcommerce(store)
+        api.nested_cache = cache
+
+        first = list(api.resource('orders'))
+        requests = store.requests
+        second = list(api.resource('orders'))
+
+        self.assertEqual(first, second)
+        # pages only
+        self.assertEqual(store.requests - requests, 3)
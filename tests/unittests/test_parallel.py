@@ -0,0 +1,85 @@
+import json
+import unittest
+
+from tap_bigcommerce.parallel import TransformPool
+from tap_bigcommerce.parallel import serialize_records, record_message
+
+
+class TestTransformPool(unittest.TestCase):
+
+    def setUp(self):
+        self.pool = TransformPool(workers=2, chunk_size=3)
+
+    def tearDown(self):
+        self.pool.shutdown()
+
+    def test_map_preserves_order(self):
+
+        schema = {
+            'type': 'object',
+            'properties': {'id': {'type': 'integer'}}
+        }
+
+        result = self.pool.map(
+            serialize_records, [{'id': i} for i in range(10)], schema, {}
+        )
+
+        self.assertEqual(
+            [json.loads(r[0])['id'] for r in result], list(range(10))
+        )
+
+    def test_serialize_records(self):
+
+        schema = {
+            'type': 'object',
+            'properties': {'id': {'type': 'integer'}}
+        }
+
+        result = self.pool.map(
+            serialize_records, [{'id': 1}, {'id': 'x'}], schema, {}
+        )
+
+        self.assertEqual(result[0], ('{"id": 1}', None))
+        self.assertIsNone(result[1][0])
+
+        message = json.loads(record_message('orders', result[0][0]))
+        self.assertEqual(message, {
+            'type': 'RECORD', 'stream': 'orders', 'record': {'id': 1}
+        })
+
+    def test_serialize_records_filters_and_transforms_dates(self):
+
+        schema = {
+            'type': 'object',
+            'properties': {
+                'id': {'type': 'integer'},
+                'date_modified': {'type': 'string', 'format': 'date-time'},
+                'products': {
+                    'type': 'array',
+                    'items': {
+                        'type': 'object',
+                        'properties': {'id': {'type': 'integer'}}
+                    }
+                }
+            }
+        }
+        row = {
+            'id': 1,
+            'date_modified': 'Tue, 01 Jan 2019 00:00:10 +0000',
+            'products': [{'id': 2, 'url': 'x'}]
+        }
+
+        result = self.pool.map(
+            serialize_records, [row], schema, {},
+            [('products', 'url')], ['date_modified']
+        )
+
+        self.assertEqual(json.loads(result[0][0]), {
+            'id': 1,
+            'date_modified': '2019-01-01T00:00:10.000000Z',
+            'products': [{'id': 2}]
+        })
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,101 @@
+import unittest
+
+from singer import Transformer
+
+from tap_bigcommerce.bigcommerce import Bigcommerce
+from tap_bigcommerce.passthrough import compile_validator
+from tap_bigcommerce.passthrough import passthrough_from_config
+
+
+SCHEMA = {
+    'type': 'object',
+    'properties': {
+        'id': {'type': ['integer', 'null']},
+        'name': {'type': ['string', 'null']},
+        'price': {'type': ['number', 'null']},
+        'is_visible': {'type': ['boolean', 'null']},
+        'date_modified': {'type': ['string', 'null'], 'format': 'date-time'},
+        'images': {
+            'type': ['array', 'null'],
+            'items': {
+                'type': 'object',
+                'properties': {'id': {'type': ['integer', 'null']}}
+            }
+        }
+    }
+}
+
+
+def row(**fields):
+    return {
+        'id': 1,
+        'name': 'Shirt',
+        'price': 10.0,
+        'is_visible': True,
+        'date_modified': '2019-01-01T00:00:00.000000Z',
+        'images': [{'id': 2}],
+        **fields
+    }
+
+
+class TestPassthrough(unittest.TestCase):
+
+    def test_conforming_rows_pass(self):
+
+        validator = compile_validator(SCHEMA)
+
+        self.assertTrue(validator(row()))
+        self.assertTrue(validator(row(price=9.5, name=None, images=None)))
+
+    def test_rows_the_transformer_would_change_fail(self):
+
+        validator = compile_validator(SCHEMA)
+
+        self.assertFalse(validator(row(id='1')))
+        self.assertFalse(validator(row(price='10.00')))
+        self.assertFalse(validator(row(id=True)))
+        # the Transformer turns '' into None for non-string types
+        self.assertFalse(validator(row(id='')))
+        self.assertFalse(validator(row(date_modified='Mon, 01 Jan 2019')))
+        # the Transformer writes floats and its own date-time format
+        self.assertFalse(validator(row(price=10)))
+        self.assertFalse(
+            validator(row(date_modified='2019-01-01T00:00:00+00:00')))
+        self.assertFalse(validator(row(sku='A')))
+        self.assertFalse(validator(row(images=[{'id': 2, 'url': 'x'}])))
+
+    def test_deselected_fields_fail(self):
+
+        validator = compile_validator(SCHEMA, [
+            'id', 'price', 'is_visible', 'date_modified', 'images'
+        ])
+
+        self.assertFalse(validator(row()))
+        without_name = row()
+        del without_name['name']
+        self.assertTrue(validator(without_name))
+
+    def test_passed_records_match_the_transformer(self):
+
+        validator = compile_validator(SCHEMA)
+
+        with Transformer() as transformer:
+            self.assertEqual(
+                transformer.transform(row(), SCHEMA, {}), row())
+        self.assertTrue(validator(row()))
+
+    def test_disabled_by_default(self):
+
+        self.assertIsNone(passthrough_from_config({}, SCHEMA))
+        self.assertIsNotNone(
+            passthrough_from_config({'raw_passthrough': True}, SCHEMA))
+
+    def test_endpoint_passthrough(self):
+
+        self.assertTrue(Bigcommerce.passthrough(Bigcommerce, 'products'))
+        self.assertFalse(Bigcommerce.passthrough(Bigcommerce, 'orders'))
+        self.assertFalse(Bigcommerce.passthrough(Bigcommerce, 'coupons'))
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,48 @@
+import unittest
+from unittest.mock import Mock
+
+from tap_bigcommerce.bigcommerce import Bigcommerce
+from tap_bigcommerce.planner import plan_stream, Progress
+
+
+class MockApi(Bigcommerce):
+
+    def __init__(self):
+        self.results_per_page = 50
+        self.rate_limit = {
+            'ms_until_reset': 30000,
+            'window_size_ms': 30000,
+            'requests_remaining': 150,
+            'requests_quota': 150
+        }
+
+
+class TestPlanner(unittest.TestCase):
+
+    def test_plan_orders(self):
+
+        client = Mock()
+        client.api = MockApi()
+        client.resource_name.side_effect = lambda name: name
+        client.count.return_value = (100, 0.5)
+
+        plan = plan_stream(client, 'orders', '2019-01-01T00:00:00Z')
+
+        # quota of 150 with 3 sub resources gives 45 results per page
+        self.assertEqual(plan['page_size'], 45)
+        self.assertEqual(plan['pages'], 3)
+        self.assertEqual(plan['requests'], 303)
+        # 303 requests at 150 per 30 seconds
+        self.assertEqual(plan['seconds'], 61)
+
+    def test_progress_eta(self):
+
+        progress = Progress('orders', {'rows': 100})
+        progress.start -= 10
+        progress.update(50)
+
+        self.assertAlmostEqual(progress.eta(progress.start + 10), 10)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,59 @@
+import threading
+import unittest
+
+from tap_bigcommerce.scheduler import PriorityScheduler
+from tap_bigcommerce.scheduler import PRIMARY, NESTED, BACKGROUND
+
+
+class TestPriorityScheduler(unittest.TestCase):
+
+    def run_blocked(self, scheduler, submissions):
+        """
+        Queue `submissions` (priority, key, label) behind a blocked
+        worker, then release it and return the order they ran in.
+        """
+        release = threading.Event()
+        order = []
+        scheduler.submit(PRIMARY, 'blocker', release.wait)
+
+        futures = [
+            scheduler.submit(priority, key, order.append, label)
+            for priority, key, label in submissions
+        ]
+        release.set()
+        for future in futures:
+            future.result(timeout=1)
+        return order
+
+    def test_primary_requests_go_first(self):
+        scheduler = PriorityScheduler(max_workers=1)
+
+        order = self.run_blocked(scheduler, [
+            (BACKGROUND, 'orders', 'hedge'),
+            (NESTED, 'orders', 'nested 1'),
+            (NESTED, 'orders', 'nested 2'),
+            (PRIMARY, 'orders', 'page')
+        ])
+        scheduler.shutdown()
+
+        self.assertEqual(order, ['page', 'nested 1', 'nested 2', 'hedge'])
+
+    def test_streams_share_by_weight(self):
+        scheduler = PriorityScheduler(
+            max_workers=1, weights={'orders': 3})
+
+        order = self.run_blocked(scheduler, [
+            (NESTED, ('a', 'orders'), 'o') for _ in range(6)
+        ] + [
+            (NESTED, ('a', 'products'), 'p') for _ in range(2)
+        ])
+        scheduler.shutdown()
+
+        self.assertEqual(''.join(order), 'opooopoo')
+
+    def test_lane_is_an_executor(self):
+        scheduler = PriorityScheduler(max_workers=2)
+        lane = scheduler.lane(NESTED, 'orders')
+
+        self.assertEqual(lane.submit(lambda x: x * 2, 21).result(1), 42)
+        scheduler.shutdown()
@@ -0,0 +1,66 @@
+import unittest
+
+from tap_bigcommerce.simulator import simulate, QUOTA_TIERS
+from tap_bigcommerce.simulator import SimulatedBigcommerce, SimulatedStore
+
+
+class TestSimulator(unittest.TestCase):
+
+    def test_pacing_avoids_rate_limit(self):
+
+        for tier, quota in QUOTA_TIERS.items():
+            report = simulate(quota, rows=500)
+
+            self.assertEqual(report['rows'], 500, tier)
+            self.assertEqual(report['rate_limited'], 0, tier)
+
+    def test_standard_plan_is_quota_bound(self):
+
+        report = simulate(QUOTA_TIERS['standard'], rows=500)
+
+        # 1500 nested requests at 150 per 30 seconds
+        self.assertGreaterEqual(report['seconds'], 300)
+        self.assertGreater(report['idle_seconds'], 0)
+
+    def test_enterprise_plan_never_waits(self):
+
+        report = simulate(QUOTA_TIERS['enterprise'], rows=500)
+
+        self.assertEqual(report['idle_seconds'], 0)
+
+    def test_simulation_is_deterministic(self):
+
+        self.assertEqual(
+            simulate(QUOTA_TIERS['pro'], rows=300, resource='products'),
+            simulate(QUOTA_TIERS['pro'], rows=300, resource='products')
+        )
+
+    def test_orders_without_consignments_avoid_rate_limit(self):
+
+        # orders without consignments follow their three stubs
+        store = SimulatedStore(QUOTA_TIERS['standard'], rows=300,
+                               sub_resources=3)
+        api = SimulatedBigcommerce(store)
+
+        rows = list(api.resource('orders_consignments'))
+
+        self.assertEqual(len(rows), 300)
+        self.assertEqual(store.rate_limited, 0)
+
+    def test_nested_collections_are_paginated(self):
+
+        store = SimulatedStore(QUOTA_TIERS['enterprise'], rows=2,
+                               sub_resources=1, nested_items=600)
+        api = SimulatedBigcommerce(store)
+
+        rows = list(api.resource('orders'))
+
+        for row in rows:
+            self.assertEqual([i['id'] for i in row['nested_0']],
+                             list(range(1, 601)))
+        # 1 page, 3 nested pages per row
+        self.assertEqual(store.requests, 1 + 1 + 2 * 3)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,97 @@
+import threading
+import unittest
+from unittest.mock import Mock, patch
+
+from tap_bigcommerce.stores import FairExecutor, store_config
+from tap_bigcommerce.stores import sync_stores
+
+
+class TestFairExecutor(unittest.TestCase):
+
+    def test_lanes_are_served_round_robin(self):
+
+        executor = FairExecutor(max_workers=1)
+        gate = threading.Event()
+        order = []
+
+        # block the only worker while both lanes queue up work
+        blocker = executor.lane('blocker').submit(gate.wait)
+
+        a, b = executor.lane('a'), executor.lane('b')
+        futures = [a.submit(order.append, 'a') for _ in range(3)]
+        futures.append(b.submit(order.append, 'b'))
+
+        gate.set()
+        blocker.result()
+        for future in futures:
+            future.result()
+        executor.shutdown()
+
+        self.assertEqual(order, ['a', 'b', 'a', 'a'])
+
+    def test_exceptions_are_set_on_future(self):
+
+        executor = FairExecutor(max_workers=1)
+        future = executor.lane().submit(int, 'x')
+
+        with self.assertRaises(ValueError):
+            future.result()
+        executor.shutdown()
+
+
+class TestStoreConfig(unittest.TestCase):
+
+    def test_store_config(self):
+
+        config = {
+            'start_date': '2019-01-01T00:00:00Z',
+            'fingerprint_path': 'fingerprints.json',
+            'stores': [{'store_hash': 'abc'}]
+        }
+
+        merged = store_config(config, {
+            'store_hash': 'abc', 'client_id': 'id', 'access_token': 'token'
+        })
+
+        self.assertNotIn('stores', merged)
+        self.assertEqual(merged['fingerprint_path'], 'fingerprints.json.abc')
+        self.assertEqual(merged['start_date'], '2019-01-01T00:00:00Z')
+
+    def test_unsupported_keys_raise(self):
+
+        stores = [{'store_hash': 'abc'}]
+        do_sync = Mock()
+
+        for config in [
+            {'stores': stores, 'daemon': True},
+            {'stores': [{'store_hash': 'abc', 'plan_only': True}]},
+        ]:
+            with self.assertRaises(Exception):
+                sync_stores(config, None, {}, do_sync)
+
+        do_sync.assert_not_called()
+
+    @patch('tap_bigcommerce.stores.BigCommerce')
+    def test_shared_scheduler_uses_max_workers(self, client_class):
+
+        schedulers = []
+
+        def do_sync(client, **kwargs):
+            schedulers.append(client.api.scheduler)
+
+        config = {
+            'start_date': '2019-01-01T00:00:00Z',
+            'client_id': 'id',
+            'access_token': 'token',
+            'stores': [{'store_hash': 'abc'}, {'store_hash': 'def'}],
+            'max_workers': 4,
+            'request_scheduler': True
+        }
+        sync_stores(config, None, {}, do_sync)
+
+        self.assertIs(schedulers[0], schedulers[1])
+        self.assertEqual(schedulers[0].max_workers, 4)
+
+
+if __name__ == '__main__':
+    unittest.main()
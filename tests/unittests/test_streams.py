@@ -1,7 +1,19 @@
+import os
+import shutil
+import tempfile
 import unittest
 
+import singer
+from singer.catalog import CatalogEntry
+from singer.schema import Schema
+
 from tap_bigcommerce.streams import Stream, STREAMS
+from tap_bigcommerce.streams import MAX_EMITTED_RANGES, add_emitted_id
 from tap_bigcommerce.client import Client
+from tap_bigcommerce.fingerprints import FingerprintStore
+from tap_bigcommerce.deadline import DeadlineReached
+from tap_bigcommerce.output import Output
+from tap_bigcommerce.sync import sync_stream
 
 from datetime import datetime, timedelta
 
@@ -10,7 +22,50 @@ BIGCOMMERCE_NEW_DATE_FORMAT = "%Y-%m-%d %H:%M:%S %z"
 
 
 class MockClient(Client):
-    pass
+
+    coupon_rows = []
+
+    def coupons(self):
+        for coupon in self.coupon_rows:
+            yield coupon
+
+    order_rows = []
+    # raise DeadlineReached after this many orders
+    order_deadline = None
+
+    def orders(self, replication_key, bookmark, cursor=None, fields=None):
+        skip = (cursor or {}).get('skip')
+        for i, order in enumerate(self.order_rows):
+            if i == self.order_deadline:
+                raise DeadlineReached('orders stopped')
+            if skip is None or not skip(order):
+                yield order
+
+    product_rows = []
+
+    def product_variants(self, replication_key, bookmark, cursor=None,
+                         fields=None):
+        # like BigCommerce.product_children, products are skipped
+        skip = (cursor or {}).get('skip')
+        for product in self.product_rows:
+            if skip is None or not skip(product):
+                for variant in product['variants']:
+                    yield {
+                        **variant,
+                        'product_id': product['id'],
+                        'product_date_modified': product['date_modified']
+                    }
+
+
+class RecordOutput(Output):
+
+    def __init__(self):
+        self.records = []
+
+    def write_message(self, message):
+        if isinstance(message, singer.RecordMessage):
+            self.records.append(message.record['id'])
+
 
 class TestStreams(unittest.TestCase):
 
@@ -70,7 +125,240 @@ class TestStreams(unittest.TestCase):
         # print(orders.load_metadata())
 
 
+    def test_fingerprints_suppress_unchanged(self):
+
+        directory = tempfile.mkdtemp()
+        path = os.path.join(directory, 'fingerprints.json')
+
+        try:
+            client = MockClient()
+            client.coupon_rows = [
+                {'id': 1, 'code': 'A'},
+                {'id': 2, 'code': 'B'}
+            ]
+
+            coupons = STREAMS['coupons'](client)
+            coupons.fingerprints = FingerprintStore(path)
+            records = [record for (_, record) in coupons.sync({})]
+            self.assertEqual(len(records), 2)
+            for record in records:
+                coupons.record_written(record)
+            coupons.fingerprints.save()
+
+            client.coupon_rows = [
+                {'id': 1, 'code': 'A'},
+                {'id': 2, 'code': 'C'},
+                {'id': 3, 'code': 'D'}
+            ]
+
+            coupons = STREAMS['coupons'](client)
+            coupons.fingerprints = FingerprintStore(path)
+            records = [record for (_, record) in coupons.sync({})]
+
+            self.assertEqual([r['id'] for r in records], [2, 3])
+        finally:
+            shutil.rmtree(directory)
+
+    def test_fingerprint_kept_only_for_written_records(self):
+
+        directory = tempfile.mkdtemp()
+        path = os.path.join(directory, 'fingerprints.json')
+
+        try:
+            client = MockClient()
+            # the second coupon fails to transform
+            client.coupon_rows = [
+                {'id': 1, 'code': 1},
+                {'id': 2, 'code': 'B'}
+            ]
+
+            coupons = STREAMS['coupons'](client)
+            coupons.fingerprints = FingerprintStore(path)
+            coupons.stream = CatalogEntry(
+                tap_stream_id='coupons',
+                schema=Schema.from_dict({
+                    'type': 'object',
+                    'properties': {
+                        'id': {'type': 'integer'},
+                        'code': {'type': 'integer'}
+                    }
+                }),
+                metadata=[]
+            )
+            output = RecordOutput()
+            sync_stream({}, coupons, output=output)
+            coupons.fingerprints.save()
+
+            self.assertEqual(output.records, [1])
+
+            coupons = STREAMS['coupons'](client)
+            coupons.fingerprints = FingerprintStore(path)
+            records = [record for (_, record) in coupons.sync({})]
+
+            self.assertEqual([r['id'] for r in records], [2])
+        finally:
+            shutil.rmtree(directory)
+
+    def test_checkpoint_resumes_at_boundary(self):
+
+        client = MockClient()
+        client.order_rows = [
+            {'id': 1, 'date_modified': '2019-01-01T00:00:00Z'},
+            {'id': 2, 'date_modified': '2019-01-02T00:00:00Z'},
+            {'id': 3, 'date_modified': '2019-01-02T00:00:00Z'},
+            {'id': 4, 'date_modified': '2019-01-03T00:00:00Z'}
+        ]
+
+        state = {'bookmarks': {
+            'orders': {'date_modified': '2018-12-31T00:00:00Z'}
+        }}
+
+        orders = STREAMS['orders'](client)
+        sync = orders.sync(state)
+        next(sync)
+        next(sync)
+        # interrupted after emitting id 2; resume from the saved state
+        next(sync)
+
+        self.assertEqual(
+            state['bookmarks']['orders']['checkpoint'],
+            {'value': '2019-01-02T00:00:00Z', 'emitted_ids': [[2, 2]]}
+        )
+
+        orders = STREAMS['orders'](client)
+        records = [record for (_, record) in orders.sync(state)]
+
+        self.assertEqual([r['id'] for r in records], [3, 4])
+        self.assertEqual(
+            state['bookmarks']['orders']['date_modified'],
+            '2019-01-03T00:00:00Z'
+        )
+
+    def test_deadline_keeps_bookmark_and_checkpoint(self):
+
+        client = MockClient()
+        client.order_rows = [
+            {'id': 1, 'date_modified': '2019-01-01T00:00:00Z'},
+            {'id': 2, 'date_modified': '2019-01-02T00:00:00Z'},
+            {'id': 3, 'date_modified': '2019-01-03T00:00:00Z'}
+        ]
+        client.order_deadline = 2
+
+        state = {'bookmarks': {
+            'orders': {'date_modified': '2018-12-31T00:00:00Z'}
+        }}
+
+        orders = STREAMS['orders'](client)
+        records = [record for (_, record) in orders.sync(state)]
+
+        self.assertEqual([r['id'] for r in records], [1, 2])
+        self.assertEqual(
+            state['bookmarks']['orders']['date_modified'],
+            '2019-01-02T00:00:00Z'
+        )
+        self.assertEqual(
+            state['bookmarks']['orders']['checkpoint'],
+            {'value': '2019-01-02T00:00:00Z', 'emitted_ids': [[2, 2]]}
+        )
+
+    def test_child_checkpoint_skips_parents_already_emitted(self):
+
+        client = MockClient()
+        client.product_rows = [
+            {'id': 7, 'date_modified': '2019-01-01T00:00:00Z',
+             'variants': [{'id': 1}, {'id': 2}]},
+            {'id': 8, 'date_modified': '2019-01-02T00:00:00Z',
+             'variants': [{'id': 3}, {'id': 4}]}
+        ]
+
+        state = {'bookmarks': {
+            'product_variants': {
+                'product_date_modified': '2018-12-31T00:00:00Z'}
+        }}
+
+        variants = STREAMS['product_variants'](client)
+        records = [record for (_, record) in variants.sync(state)]
+        self.assertEqual([r['id'] for r in records], [1, 2, 3, 4])
+
+        checkpoint = state['bookmarks']['product_variants']['checkpoint']
+        self.assertEqual(checkpoint, {
+            'value': '2019-01-02T00:00:00Z', 'emitted_ids': [[8, 8]]})
+
+        for _ in range(2):
+            variants = STREAMS['product_variants'](client)
+            records = [record for (_, record) in variants.sync(state)]
+
+            self.assertEqual(records, [])
+            self.assertEqual(
+                state['bookmarks']['product_variants']['checkpoint'],
+                checkpoint
+            )
+
+    def test_checkpoint_of_bulk_update_is_compact(self):
+
+        client = MockClient()
+        # a bulk edit stamps every row with the same date_modified
+        client.order_rows = [
+            {'id': id, 'date_modified': '2019-01-02T00:00:00Z'}
+            for id in list(range(1, 3001)) + list(range(5001, 6001))
+        ]
+        client.order_rows.reverse()
+
+        state = {'bookmarks': {
+            'orders': {'date_modified': '2019-01-01T00:00:00Z'}
+        }}
+
+        orders = STREAMS['orders'](client)
+        sync = orders.sync(state)
+        for _ in range(3500):
+            next(sync)
+
+        # the last row yielded isn't recorded until the next is requested
+        checkpoint = state['bookmarks']['orders']['checkpoint']
+        self.assertEqual(checkpoint['emitted_ids'],
+                         [[502, 3000], [5001, 6000]])
+
+        # resume: only the rows not yet emitted
+        orders = STREAMS['orders'](client)
+        records = [record for (_, record) in orders.sync(state)]
+        self.assertEqual(sorted(r['id'] for r in records),
+                         list(range(1, 502)))
+        self.assertEqual(
+            state['bookmarks']['orders']['checkpoint']['emitted_ids'],
+            [[1, 3000], [5001, 6000]]
+        )
+
+    def test_emitted_ranges_are_capped(self):
+
+        ranges = []
+        for id in range(0, 2 * (MAX_EMITTED_RANGES + 10), 2):
+            add_emitted_id(ranges, id)
+
+        self.assertEqual(len(ranges), MAX_EMITTED_RANGES)
+        self.assertEqual(ranges[-1], [2 * (MAX_EMITTED_RANGES + 9)] * 2)
+
+    def test_selected_fields(self):
+
+        products = STREAMS['products'](MockClient())
+        catalog_entry = CatalogEntry(
+            tap_stream_id='products',
+            metadata=products.load_metadata()
+        )
+        products.stream = catalog_entry
+
+        self.assertIsNone(products.selected_fields())
+
+        for entry in catalog_entry.metadata:
+            if entry['breadcrumb'] and \
+                    entry['breadcrumb'][1] in ('name', 'id'):
+                entry['metadata']['selected'] = False
+
+        fields = products.selected_fields()
 
+        self.assertNotIn('name', fields)
+        # automatic fields are always selected
+        self.assertIn('id', fields)
+        self.assertIn('date_modified', fields)
 
 
 if __name__ == '__main__':
@@ -0,0 +1,84 @@
+import os
+import shutil
+import tempfile
+import unittest
+
+from tap_bigcommerce.simulator import SimulatedBigcommerce, SimulatedStore
+from tap_bigcommerce.simulator import QUOTA_TIERS
+from tap_bigcommerce.targeted import parse_target, read_targets, mark_done
+
+
+class TestTargets(unittest.TestCase):
+
+    def setUp(self):
+        self.directory = tempfile.mkdtemp()
+
+    def tearDown(self):
+        shutil.rmtree(self.directory)
+
+    def test_parse_target(self):
+
+        self.assertEqual(parse_target('orders, 100'), ('orders', 100))
+        self.assertEqual(
+            parse_target('{"stream": "products", "id": 7}'), ('products', 7))
+        self.assertEqual(parse_target(
+            '{"scope": "store/customer/updated", '
+            '"data": {"type": "customer", "id": 3}}'
+        ), ('customers', 3))
+        self.assertIsNone(parse_target('  '))
+        self.assertIsNone(parse_target('# comment'))
+
+        with self.assertRaises(Exception):
+            parse_target('coupons,1')
+
+    def test_queue_directory(self):
+
+        with open(os.path.join(self.directory, 'a.jsonl'), 'w') as f:
+            f.write('orders,2\norders,1\n')
+        with open(os.path.join(self.directory, 'b.txt'), 'w') as f:
+            f.write('orders,2\nproducts,5\n')
+        with open(os.path.join(self.directory, 'old.txt.done'), 'w') as f:
+            f.write('orders,9\n')
+
+        targets, files = read_targets(self.directory)
+        self.assertEqual(targets, {'orders': [1, 2], 'products': [5]})
+
+        mark_done(self.directory, files)
+        self.assertEqual(read_targets(self.directory), ({}, []))
+
+
+class TestResourceByIds(unittest.TestCase):
+
+    def test_v2_rows_by_id(self):
+        store = SimulatedStore(quota=7000000, rows=10, sub_resources=3)
+        api = SimulatedBigcommerce(store)
+
+        rows = list(api.resource_by_ids('orders', [3, 11, 5]))
+
+        # 11 doesn't exist
+        self.assertEqual([row['id'] for row in rows], [3, 5])
+        self.assertEqual(rows[0]['nested_0'], [{'id': 1}])
+
+    def test_v3_rows_in_batches(self):
+        store = SimulatedStore(quota=7000000, rows=100, sub_resources=0)
+        api = SimulatedBigcommerce(store)
+
+        ids = list(range(1, 121))
+        rows = list(api.resource_by_ids('products', ids))
+
+        self.assertEqual([row['id'] for row in rows], list(range(1, 101)))
+        # auth check and 3 batches of 50
+        self.assertEqual(store.requests, 4)
+
+    def test_v2_rows_by_id_on_standard_plan(self):
+        store = SimulatedStore(QUOTA_TIERS['standard'], rows=200,
+                               sub_resources=3)
+        api = SimulatedBigcommerce(store)
+
+        ids = list(range(1, 100))
+        rows = list(api.resource_by_ids('orders', ids))
+
+        self.assertEqual(sorted(row['id'] for row in rows), ids)
+        # each batch of ids and sub resources fits in one window
+        self.assertLessEqual(api.ids_batch_size('orders') * 4, 150)
+        self.assertEqual(store.rate_limited, 0)
@@ -0,0 +1,105 @@
+import os
+import json
+import shutil
+import tempfile
+import unittest
+from datetime import timedelta
+from concurrent.futures import ThreadPoolExecutor
+
+from tap_bigcommerce.bigcommerce import Bigcommerce
+from tap_bigcommerce.trace import Tracer, url_template
+
+
+class Response():
+
+    status_code = 200
+    content = b'[{"id": 1}]'
+    elapsed = timedelta(seconds=0.25)
+
+
+class TestTrace(unittest.TestCase):
+
+    def setUp(self):
+        self.directory = tempfile.mkdtemp()
+
+    def tearDown(self):
+        shutil.rmtree(self.directory)
+
+    def test_url_template(self):
+
+        self.assertEqual(
+            url_template(
+                'https://api.bigcommerce.com/stores/abc/v2/orders/123/products'
+                '?page=2'),
+            '/stores/abc/v2/orders/{id}/products'
+        )
+
+    def test_jsonl_spans(self):
+        path = os.path.join(self.directory, 'trace.jsonl')
+        tracer = Tracer(path)
+        page = tracer.record('page', 100.0, 101.5, resource='orders', page=1)
+        tracer.record('GET', 100.5, 101.0, parent=page, status=200)
+        tracer.close()
+
+        with open(path) as f:
+            spans = [json.loads(line) for line in f]
+
+        self.assertEqual(spans[0]['name'], 'page')
+        self.assertEqual(spans[0]['duration_ms'], 1500.0)
+        self.assertEqual(spans[1]['parent'], spans[0]['id'])
+        self.assertEqual(spans[1]['status'], 200)
+
+    def test_chrome_trace(self):
+        path = os.path.join(self.directory, 'trace.json')
+        tracer = Tracer(path, format='chrome')
+        tracer.record('GET', 100.0, 100.25, url='/v2/orders')
+        tracer.record('sleep', 100.25, 101.0)
+        tracer.close()
+
+        with open(path) as f:
+            events = json.load(f)
+
+        # thread name metadata and two spans
+        self.assertEqual([e['ph'] for e in events], ['M', 'X', 'X'])
+        self.assertEqual(events[1]['dur'], 250000)
+
+    def test_request_span(self):
+        path = os.path.join(self.directory, 'trace.jsonl')
+        api = Bigcommerce.__new__(Bigcommerce)
+        api.tracer = Tracer(path)
+        api.trace_parent = 7
+
+        send = api._traced(
+            Response, 'https://api.bigcommerce.com/stores/abc/v2/orders/5',
+            {'page': 3})
+        with ThreadPoolExecutor(thread_name_prefix='worker') as executor:
+            executor.submit(send).result()
+        api.tracer.close()
+
+        with open(path) as f:
+            span = json.loads(f.readline())
+
+        self.assertEqual(span['url'], '/stores/abc/v2/orders/{id}')
+        self.assertEqual(span['parent'], 7)
+        self.assertEqual(span['page'], 3)
+        self.assertEqual(span['bytes'], 11)
+        self.assertTrue(span['thread'].startswith('worker'))
+        self.assertIsNone(span['error'])
+
+    def test_span_for_each_hedged_attempt(self):
+        path = os.path.join(self.directory, 'trace.jsonl')
+        api = Bigcommerce.__new__(Bigcommerce)
+        api.tracer = Tracer(path)
+        api.trace_parent = 7
+
+        send = api._traced(
+            Response, 'https://api.bigcommerce.com/stores/abc/v2/orders/5',
+            {})
+        send()
+        send()
+        api.tracer.close()
+
+        with open(path) as f:
+            spans = [json.loads(line) for line in f]
+
+        self.assertEqual([s['attempt'] for s in spans], [1, 2])